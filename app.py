@@ -10,6 +10,7 @@ st.set_page_config(
 
 from views import executive_summary, oee_drilldown, financial_risk, asset_detail, line_visualization
 from utils.unified_assistant import build_unified_widget
+from utils.data_loader import run_query
 
 # Custom CSS for better styling
 st.markdown("""
@@ -70,6 +71,19 @@ def build_unified_widget_fragment(page_context=None):
     """Fragment wrapper to allow independent widget loading"""
     build_unified_widget(page_context=page_context)
 
+# --- CACHE CONTROL ---
+# Query results (and the page loaders built on them) are cached; this forces the next render to re-read Snowflake.
+# Only the data caches are cleared - templates, suggestions and other caches are left alone.
+with st.sidebar:
+    if st.button("🔄 Refresh Data", help="Clear cached query results"):
+        run_query.clear()
+        oee_drilldown.get_oee_breakdown.clear()
+        asset_detail.get_hierarchy_data.clear()
+        asset_detail.get_hierarchy_index.clear()
+        line_visualization.get_plants_data.clear()
+        line_visualization.get_lines_data.clear()
+        line_visualization.get_factory_data.clear()
+
 # --- TOP NAVIGATION MENU ---
 selected_page = option_menu(
     menu_title=None,
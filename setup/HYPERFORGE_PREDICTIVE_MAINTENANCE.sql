@@ -22,6 +22,7 @@ GRANT CREATE SEQUENCE ON FUTURE SCHEMAS IN DATABASE HYPERFORGE TO ROLE HYPERFORG
 GRANT CREATE STREAMLIT ON FUTURE SCHEMAS IN DATABASE HYPERFORGE TO ROLE HYPERFORGE_ROLE;
 GRANT CREATE SEMANTIC VIEW ON FUTURE SCHEMAS IN DATABASE HYPERFORGE TO ROLE HYPERFORGE_ROLE;
 GRANT CREATE MATERIALIZED VIEW ON FUTURE SCHEMAS IN DATABASE HYPERFORGE TO ROLE HYPERFORGE_ROLE;
+GRANT CREATE DYNAMIC TABLE ON FUTURE SCHEMAS IN DATABASE HYPERFORGE TO ROLE HYPERFORGE_ROLE;
 CREATE OR REPLACE SCHEMA BRONZE COMMENT = 'Schema for raw, unaltered source data';
 CREATE OR REPLACE SCHEMA SILVER COMMENT = 'Schema for cleaned, conformed, and integrated data (Star Schema)';
 CREATE OR REPLACE SCHEMA GOLD COMMENT = 'Schema for business-level aggregates and ML feature stores';
@@ -1250,6 +1251,62 @@ LEFT JOIN (
 WHERE do.observation_date >= '2025-09-01'::DATE
 ORDER BY do.observation_date_sk, do.ASSET_ID;
 
+-- ASSET_LATEST_HEALTH: Most recent hourly health row per asset, kept up to date by Snowflake
+-- (a dynamic table rather than a materialized view, which cannot contain window functions)
+CREATE OR REPLACE DYNAMIC TABLE ASSET_LATEST_HEALTH
+  TARGET_LAG = '1 hour'
+  WAREHOUSE = HYPERFORGE_STREAMLIT_WH
+AS
+SELECT ASSET_ID, HOUR_TIMESTAMP, LATEST_HEALTH_SCORE, AVG_FAILURE_PROBABILITY, MIN_RUL_DAYS
+FROM HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH
+QUALIFY ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY HOUR_TIMESTAMP DESC) = 1;
+
+-- AGG_LINE_DAILY_PRODUCTION: Production sums per plant, line and day for current assets, kept up
+-- to date by Snowflake (backs the OEE Drill-Down view instead of scanning FCT_PRODUCTION_LOG)
+CREATE OR REPLACE DYNAMIC TABLE AGG_LINE_DAILY_PRODUCTION
+  TARGET_LAG = '1 hour'
+  WAREHOUSE = HYPERFORGE_STREAMLIT_WH
+AS
+SELECT
+    P.PLANT_NAME,
+    L.LINE_NAME,
+    PL.PRODUCTION_DATE,
+    SUM(PL.PLANNED_RUNTIME_HOURS) AS PLANNED_RUNTIME_HOURS,
+    SUM(PL.ACTUAL_RUNTIME_HOURS) AS ACTUAL_RUNTIME_HOURS,
+    SUM(PL.UNITS_PRODUCED) AS UNITS_PRODUCED,
+    SUM(PL.UNITS_SCRAPPED) AS UNITS_SCRAPPED
+FROM HYPERFORGE.SILVER.FCT_PRODUCTION_LOG PL
+JOIN HYPERFORGE.SILVER.DIM_ASSET A ON PL.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
+JOIN HYPERFORGE.SILVER.DIM_PROCESS PR ON PR.PROCESS_ID = A.PROCESS_ID
+JOIN HYPERFORGE.SILVER.DIM_LINE L ON PR.LINE_ID = L.LINE_ID
+JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
+GROUP BY P.PLANT_NAME, L.LINE_NAME, PL.PRODUCTION_DATE;
+
+-- V_ASSET_DETAIL: Current assets pre-joined with their hierarchy and latest hourly health
+-- (backs the Asset Detail view's per-asset lookup)
+CREATE OR REPLACE VIEW V_ASSET_DETAIL AS
+SELECT 
+    A.ASSET_ID,
+    A.ASSET_NAME,
+    A.MODEL,
+    A.OEM_NAME,
+    A.INSTALLATION_DATE,
+    A.DOWNTIME_IMPACT_PER_HOUR,
+    AC.CLASS_NAME,
+    P.PROCESS_NAME,
+    L.LINE_NAME,
+    PL.PLANT_NAME,
+    G.LATEST_HEALTH_SCORE,
+    G.AVG_FAILURE_PROBABILITY,
+    G.MIN_RUL_DAYS
+FROM HYPERFORGE.SILVER.DIM_ASSET A
+JOIN HYPERFORGE.SILVER.DIM_ASSET_CLASS AC ON A.ASSET_CLASS_ID = AC.ASSET_CLASS_ID
+JOIN HYPERFORGE.SILVER.DIM_PROCESS P ON A.PROCESS_ID = P.PROCESS_ID
+JOIN HYPERFORGE.SILVER.DIM_LINE L ON P.LINE_ID = L.LINE_ID
+JOIN HYPERFORGE.SILVER.DIM_PLANT PL ON L.PLANT_ID = PL.PLANT_ID
+LEFT JOIN HYPERFORGE.GOLD.ASSET_LATEST_HEALTH G ON A.ASSET_ID = G.ASSET_ID
+WHERE A.IS_CURRENT = TRUE;
+
 /*************************************************************************************************/
 -- Step 3: Create Stage and Semantic View for Cortex Analyst
 /*************************************************************************************************/
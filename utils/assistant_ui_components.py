@@ -8,8 +8,15 @@ including suggested questions, message formatting, and conversation controls.
 import streamlit as st
 from typing import List, Dict, Optional, Callable
 import json
+import logging
+from collections import deque
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Feedback entries kept per session (oldest are dropped first)
+FEEDBACK_LOG_MAXLEN = 200
+
 
 # ==================================================================================================
 # SUGGESTED QUESTIONS COMPONENT
@@ -379,6 +386,13 @@ def render_feedback_form(message_id: str) -> None:
             st.success("Thank you for your detailed feedback!")
 
 
+def feedback_log() -> deque:
+    """The session's bounded feedback log, created on first use."""
+    if "feedback_log" not in st.session_state:
+        st.session_state.feedback_log = deque(maxlen=FEEDBACK_LOG_MAXLEN)
+    return st.session_state.feedback_log
+
+
 def log_feedback(message_id: str, rating: str) -> None:
     """
     Log simple feedback (thumbs up/down).
@@ -395,11 +409,9 @@ def log_feedback(message_id: str, rating: str) -> None:
     }
     
     # Store in session state for now
-    if "feedback_log" not in st.session_state:
-        st.session_state.feedback_log = []
-    st.session_state.feedback_log.append(feedback_data)
+    feedback_log().append(feedback_data)
     
-    print(f"📊 Feedback logged: {feedback_data}")
+    logger.debug("📊 Feedback logged: %s", feedback_data)
 
 
 def log_detailed_feedback(message_id: str, rating: str, feedback_text: str) -> None:
@@ -419,11 +431,9 @@ def log_detailed_feedback(message_id: str, rating: str, feedback_text: str) -> N
     }
     
     # Store in session state for now
-    if "feedback_log" not in st.session_state:
-        st.session_state.feedback_log = []
-    st.session_state.feedback_log.append(feedback_data)
+    feedback_log().append(feedback_data)
     
-    print(f"📊 Detailed feedback logged: {feedback_data}")
+    logger.debug("📊 Detailed feedback logged: %s", feedback_data)
 
 
 # ==================================================================================================
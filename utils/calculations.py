@@ -9,6 +9,8 @@
 #
 # CONTAINED FUNCTIONS:
 #   - calculate_oee: A function dedicated to calculating Overall Equipment Effectiveness.
+#   - add_oee_columns: The same OEE calculation, vectorized over rows of pre-aggregated sums.
+#   - lttb_downsample: Reduces a time series to a fixed number of visually representative points.
 #
 # --------------------------------------------------------------------------------------------------
 # FUNCTION: calculate_oee(df_prod)
@@ -37,8 +39,40 @@
 #     - Performance: For this dashboard, Performance is a simplified, fixed value (95%). In a
 #       production environment, this would be a dynamic calculation based on ideal cycle times.
 #
+# --------------------------------------------------------------------------------------------------
+# FUNCTION: add_oee_columns(df)
+# --------------------------------------------------------------------------------------------------
+#   - DESCRIPTION:
+#     - Applies the calculate_oee logic to every row of a DataFrame whose rows are already summed
+#       production figures (e.g., one row per plant, line or day), without a per-group Python call.
+#
+#   - PARAMETERS:
+#     - df (pd.DataFrame): A DataFrame with the same four columns calculate_oee expects, each row
+#       holding sums for one group.
+#
+#   - RETURNS:
+#     - pd.DataFrame: A copy of df with AVAILABILITY, PERFORMANCE, QUALITY and OEE columns added.
+#       Rows with zero planned runtime or zero units produced get 0.0, as in calculate_oee.
+#
+# --------------------------------------------------------------------------------------------------
+# FUNCTION: lttb_downsample(x, y, n_out)
+# --------------------------------------------------------------------------------------------------
+#   - DESCRIPTION:
+#     - Largest-Triangle-Three-Buckets downsampling for line charts. Keeps the first and last
+#       points and, from each of n_out - 2 equal buckets in between, the point forming the largest
+#       triangle with the previously kept point and the average of the next bucket.
+#
+#   - PARAMETERS:
+#     - x (np.ndarray): Sorted numeric or datetime64 x values.
+#     - y (np.ndarray): y values, same length as x.
+#     - n_out (int): Number of points to keep.
+#
+#   - RETURNS:
+#     - tuple: (x, y) arrays of at most n_out points; the inputs unchanged if already small enough.
+#
 # ==================================================================================================
 
+import numpy as np
 import pandas as pd
 
 def calculate_oee(df_prod: pd.DataFrame) -> tuple[float, float, float, float]:
@@ -78,4 +112,62 @@ def calculate_oee(df_prod: pd.DataFrame) -> tuple[float, float, float, float]:
     # 4. Calculate Final OEE
     oee = availability * performance * quality
     
-    return oee, availability, performance, quality
\ No newline at end of file
+    return oee, availability, performance, quality
+
+
+def add_oee_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds OEE and its components, computed row-wise from summed production columns.
+
+    Args:
+        df (pd.DataFrame): DataFrame with one row of production sums per group.
+
+    Returns:
+        pd.DataFrame: df with AVAILABILITY, PERFORMANCE, QUALITY and OEE columns added.
+    """
+    planned = df['PLANNED_RUNTIME_HOURS']
+    produced = df['UNITS_PRODUCED']
+    availability = np.where(planned > 0, df['ACTUAL_RUNTIME_HOURS'] / planned.where(planned > 0), 0.0)
+    quality = np.where(produced > 0, (produced - df['UNITS_SCRAPPED']) / produced.where(produced > 0), 0.0)
+    performance = 0.95  # Same fixed stand-in as calculate_oee
+    return df.assign(AVAILABILITY=availability, PERFORMANCE=performance, QUALITY=quality,
+                     OEE=availability * performance * quality)
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Downsamples a series with Largest-Triangle-Three-Buckets.
+
+    Args:
+        x (np.ndarray): Sorted numeric or datetime64 x values.
+        y (np.ndarray): y values, same length as x.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The kept x and y values, in order.
+    """
+    n = len(y)
+    if n_out < 3 or n <= n_out:
+        return x, y
+    
+    # Work in float64 (datetimes as milliseconds) for the triangle areas
+    xf = x.astype('datetime64[ms]').astype(np.float64) if np.issubdtype(x.dtype, np.datetime64) else x.astype(np.float64)
+    yf = y.astype(np.float64)
+    
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[end:next_end].mean()
+        avg_y = yf[end:next_end].mean()
+        
+        area = np.abs((xf[a] - avg_x) * (yf[start:end] - yf[a]) - (xf[a] - xf[start:end]) * (avg_y - yf[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        kept[i + 1] = a
+    
+    return x[kept], y[kept]
@@ -117,28 +117,51 @@ class ConversationManager:
         Returns:
             Message ID
         """
-        import uuid
-        message_id = str(uuid.uuid4())
-        
-        message = {
-            "message_id": message_id,
+        return self.save_messages_batch(conversation_id, [{
             "role": role,
             "content": content,
-            "timestamp": datetime.now().isoformat(),
             "backend_used": backend_used,
             "response_time_ms": response_time_ms,
-            "metadata": metadata or {}
-        }
+            "metadata": metadata
+        }])[0]
+    
+    def save_messages_batch(self, conversation_id: str, messages: List[Dict]) -> List[str]:
+        """
+        Save several messages to the conversation in a single write.
+        
+        Args:
+            conversation_id: Conversation identifier
+            messages: Dicts with 'role' and 'content', plus optional 'backend_used',
+                'response_time_ms' and 'metadata' (same meaning as in save_message)
+            
+        Returns:
+            Message IDs, in the order given
+        """
+        import uuid
+        timestamp = datetime.now().isoformat()
+        
+        records = [
+            {
+                "message_id": str(uuid.uuid4()),
+                "role": msg["role"],
+                "content": msg["content"],
+                "timestamp": timestamp,
+                "backend_used": msg.get("backend_used"),
+                "response_time_ms": msg.get("response_time_ms"),
+                "metadata": msg.get("metadata") or {}
+            }
+            for msg in messages
+        ]
         
         if self.storage_backend == "session":
-            self._save_to_session(conversation_id, message)
+            self._save_to_session(conversation_id, records)
         elif self.storage_backend == "snowflake":
-            self._save_to_snowflake(conversation_id, message)
+            self._save_to_snowflake(conversation_id, records)
         
-        return message_id
+        return [record["message_id"] for record in records]
     
-    def _save_to_session(self, conversation_id: str, message: Dict):
-        """Save message to session state."""
+    def _save_to_session(self, conversation_id: str, messages: List[Dict]):
+        """Save messages to session state."""
         # Use dictionary key access instead of attribute access
         if "conversations" not in st.session_state:
             st.session_state["conversations"] = {}
@@ -146,11 +169,29 @@ class ConversationManager:
         if conversation_id not in st.session_state["conversations"]:
             st.session_state["conversations"][conversation_id] = []
         
-        st.session_state["conversations"][conversation_id].append(message)
+        st.session_state["conversations"][conversation_id].extend(messages)
     
-    def _save_to_snowflake(self, conversation_id: str, message: Dict):
-        """Save message to Snowflake."""
+    def _save_to_snowflake(self, conversation_id: str, messages: List[Dict]):
+        """Save messages to Snowflake with one multi-row INSERT."""
         try:
+            user_id = self._get_user_id()
+            # One bound (%s, ...) row per message - content is never spliced into the SQL text
+            values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(messages))
+            params = [
+                value
+                for message in messages
+                for value in (
+                    conversation_id,
+                    message["message_id"],
+                    user_id,
+                    message["timestamp"],
+                    message["role"],
+                    message["content"],
+                    message["backend_used"],
+                    message["response_time_ms"],
+                    json.dumps(message["metadata"])
+                )
+            ]
             insert_sql = f"""
             INSERT INTO HYPERFORGE.ANALYTICS.CONVERSATION_HISTORY (
                 conversation_id,
@@ -162,24 +203,16 @@ class ConversationManager:
                 backend_used,
                 response_time_ms,
                 metadata
-            ) VALUES (
-                '{conversation_id}',
-                '{message["message_id"]}',
-                '{self._get_user_id()}',
-                '{message["timestamp"]}',
-                '{message["role"]}',
-                '{message["content"].replace("'", "''")}',
-                '{message["backend_used"]}',
-                {message["response_time_ms"] or "NULL"},
-                PARSE_JSON('{json.dumps(message["metadata"])}')
-            );
+            )
+            SELECT column1, column2, column3, column4, column5, column6, column7, column8, PARSE_JSON(column9)
+            FROM VALUES {values};
             """
-            run_query(insert_sql)
-            logger.info(f"✅ Saved message {message['message_id']} to Snowflake")
+            run_query(insert_sql, params=params)
+            logger.info(f"✅ Saved {len(messages)} message(s) to Snowflake")
         except Exception as e:
-            logger.error(f"❌ Failed to save message to Snowflake: {e}")
+            logger.error(f"❌ Failed to save messages to Snowflake: {e}")
             # Fallback to session storage
-            self._save_to_session(conversation_id, message)
+            self._save_to_session(conversation_id, messages)
     
     def get_conversation_history(
         self,
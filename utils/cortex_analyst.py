@@ -5,8 +5,9 @@ import os
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
+import threading
 from typing import List, Dict, Optional, Tuple
-from .data_loader import run_query, get_base_url, get_pat_token, build_snowflake_headers, get_verify_ssl
+from .data_loader import run_query, get_base_url, get_pat_token, build_snowflake_headers, build_http_session, get_verify_ssl
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ class SnowflakeCortexAnalyst:
         self.verify_ssl = verify_ssl
 
         self.base_url = get_base_url(account)
+        self._session = build_http_session(verify_ssl)
         # Optional connection name to support SNOWFLAKE_CONNECTIONS_<NAME>_TOKEN
         self.connection_name = st.secrets.get("features", {}).get("connection_name") if hasattr(st, "secrets") else None
 
@@ -34,20 +36,17 @@ class SnowflakeCortexAnalyst:
             headers = build_snowflake_headers(token, accept='application/json')
             url = f"{self.base_url}{endpoint}"
             
-            print(f"🔍 API REQUEST DEBUG:")
-            print(f"URL: {url}")
-            print(f"Request Body: {json.dumps(data, indent=2)}")
-            print("=" * 50)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 Cortex Analyst request - url: %s, body: %s", url, json.dumps(data, indent=2))
             
-            response = requests.post(
+            response = self._session.post(
                 url, headers=headers, json=data, 
                 timeout=API_TIMEOUT, verify=self.verify_ssl
             )
             
-            print(f"🔍 API RESPONSE DEBUG:")
-            print(f"Status Code: {response.status_code}")
-            print(f"Response Content: {response.text[:500]}...")
-            print("=" * 50)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 Cortex Analyst response - status: %s, content: %s...",
+                             response.status_code, response.text[:500])
             
             if response.status_code < 400:
                 return response.json(), None
@@ -81,8 +80,9 @@ class SnowflakeCortexAnalyst:
         api_messages = self._ensure_alternating_roles(api_messages)
         
         # Debug: Show message role sequence
-        role_sequence = [msg.get("role", "unknown") for msg in api_messages]
-        print(f"🔧 Message role sequence: {' -> '.join(role_sequence)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            role_sequence = [msg.get("role", "unknown") for msg in api_messages]
+            logger.debug("🔧 Message role sequence: %s", " -> ".join(role_sequence))
         
         # Try with SQL execution enabled first
         request_body = {
@@ -92,7 +92,7 @@ class SnowflakeCortexAnalyst:
         if self.role:
             request_body["role"] = self.role
         
-        print(f"🔧 Calling Cortex Analyst API with {len(api_messages)} messages...")
+        logger.debug("🔧 Calling Cortex Analyst API with %d messages...", len(api_messages))
         return self._make_api_request("/api/v2/cortex/analyst/message", request_body)
     
     def _ensure_alternating_roles(self, messages: List[Dict]) -> List[Dict]:
@@ -145,7 +145,7 @@ class SnowflakeCortexAnalyst:
             stored for followup questions.
         """
         
-        print("🤖 Getting response from Cortex Analyst...")
+        logger.debug("🤖 Getting response from Cortex Analyst...")
         response, error = self.get_analyst_response(messages, semantic_model_path)
         
         if error:
@@ -167,17 +167,15 @@ class SnowflakeCortexAnalyst:
             
             # If we have SQL, execute it with data_loader
             if sql_statement:
-                print("🔍 Executing SQL with data_loader...")
-                print(f"📝 SQL Query:\n{sql_statement}")
+                logger.debug("🔍 Executing SQL with data_loader:\n%s", sql_statement)
                 try:
                     df = run_query(sql_statement)
-                    print(f"📊 Query returned {len(df)} rows with {len(df.columns)} columns")
-                    print(f"📋 Column names: {list(df.columns)}")
+                    logger.debug("📊 Query returned %d rows with columns: %s", len(df), list(df.columns))
                     
                     if len(df) > 0:
                         # Debug: Show first row to understand data structure
-                        if len(df) > 0:
-                            print(f"🔍 First row sample: {df.iloc[0].to_dict()}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("🔍 First row sample: %s", df.iloc[0].to_dict())
                         
                         formatted_results = self._format_results(df, interpretation)
                         return formatted_results, None, content
@@ -251,21 +249,24 @@ class SnowflakeCortexAnalyst:
 
 # Global client instance
 _cortex_client: Optional[SnowflakeCortexAnalyst] = None
+_cortex_lock = threading.Lock()
 
 def _get_cortex_client() -> SnowflakeCortexAnalyst:
     global _cortex_client
     
     if _cortex_client is None:
-        config = st.secrets["snowflake"]
+        with _cortex_lock:
+            if _cortex_client is None:
+                config = st.secrets["snowflake"]
 
-        verify_ssl = get_verify_ssl(config.get("verify_ssl", True))
+                verify_ssl = get_verify_ssl(config.get("verify_ssl", True))
 
-        _cortex_client = SnowflakeCortexAnalyst(
-            account=config["account"],
-            user=config["user"],
-            role=config.get("role"),
-            verify_ssl=verify_ssl
-        )
+                _cortex_client = SnowflakeCortexAnalyst(
+                    account=config["account"],
+                    user=config["user"],
+                    role=config.get("role"),
+                    verify_ssl=verify_ssl
+                )
     
     return _cortex_client
 
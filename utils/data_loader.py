@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
 from snowflake.connector import connect
 import os
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
@@ -29,7 +31,7 @@ def run_query(query: str, params: list = None) -> pd.DataFrame:
 
 
 def run_queries_parallel(
-    queries: Dict[str, str], 
+    queries: Dict[str, Union[str, Tuple[str, list]]], 
     max_workers: int = 4,
     return_empty_on_error: bool = True
 ) -> Dict[str, pd.DataFrame]:
@@ -37,8 +39,9 @@ def run_queries_parallel(
     Execute multiple independent queries in parallel using ThreadPoolExecutor.
     
     Args:
-        queries: Dictionary mapping result names to SQL query strings
-                 Example: {'sales': 'SELECT * FROM sales', 'products': 'SELECT * FROM products'}
+        queries: Dictionary mapping result names to SQL query strings, or to (sql, params) tuples
+                 for queries with bind parameters
+                 Example: {'sales': 'SELECT * FROM sales', 'recent': ('SELECT * FROM sales WHERE DAY >= %s', [start])}
         max_workers: Maximum number of concurrent query threads (default: 4)
         return_empty_on_error: If True, returns empty DataFrame on error; if False, raises exception
         
@@ -64,7 +67,7 @@ def run_queries_parallel(
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all queries
         future_to_name = {
-            executor.submit(run_query, query): name 
+            executor.submit(run_query, *((query,) if isinstance(query, str) else query)): name 
             for name, query in queries.items()
         }
         
@@ -178,6 +181,15 @@ def get_pat_token(connection_name: Optional[str] = None) -> str:
     )
 
 
+def build_http_session(verify_ssl: bool = True, pool_connections: int = 4, pool_maxsize: int = 16) -> requests.Session:
+    """Build a pooled HTTP session so REST calls reuse TCP/TLS connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.verify = verify_ssl
+    return session
+
+
 def build_snowflake_headers(token: str, accept: str = "application/json") -> dict:
     """Build standard headers for Snowflake REST APIs using PAT."""
     return {
@@ -3,21 +3,79 @@ import json
 import requests
 import os
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import logging
-from typing import List, Dict, Optional, Tuple, Any
+import time
+import random
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Any, Iterator, Generator
 from .data_loader import (
     run_query,
     get_base_url,
     get_pat_token,
     build_snowflake_headers,
+    build_http_session,
     get_verify_ssl,
 )
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 API_TIMEOUT = 50
+MAX_TOOL_WORKERS = 8
+TOKEN_TTL_SECONDS = 300.0
+# SSE event carrying incremental answer text
+TEXT_DELTA_EVENT = "response.text.delta"
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 4.0
+RESPONSE_CACHE_MAXSIZE = 128
+RESPONSE_CACHE_TTL_SECONDS = 300.0
+RESPONSE_CACHE_SESSION_KEY = "_intel_resp_cache"
+
+
+@dataclass
+class AgentMessage:
+    """Intelligence Agent message normalized into text parts and tool calls."""
+    text_parts: List[str] = field(default_factory=list)
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    
+    @classmethod
+    def from_payload(cls, payload: Any) -> "AgentMessage":
+        """Parse a raw agent message (string or list content, optional tool_calls)."""
+        message = cls()
+        if not isinstance(payload, dict):
+            return message
+        
+        match payload.get("content"):
+            case str() as text:
+                message.text_parts.append(text)
+            case list() as items:
+                for item in items:
+                    match item:
+                        case str():
+                            message.text_parts.append(item)
+                        case {"type": "text"}:
+                            message.text_parts.append(item.get("text", ""))
+                        case {"type": "tool_call"}:
+                            message.tool_calls.append(item)
+        
+        message.tool_calls.extend(payload.get("tool_calls") or [])
+        return message
 
 
 class IntelligenceToolExecutor:
@@ -26,6 +84,14 @@ class IntelligenceToolExecutor:
     Provides maintenance operations beyond simple data queries.
     """
     
+    # Status tiers: np.digitize(values, *_BINS) indexes into the matching labels
+    _HEALTH_BINS = np.array([70, 90])
+    _HEALTH_EMOJI = np.array(["🚨", "⚠️", "✅"])
+    _RISK_BINS = np.array([0.6, 0.8])  # Upper bound inclusive, digitize with right=True
+    _RISK_LEVELS = np.array(["🟡 Medium", "⚠️ High", "🚨 Critical"])
+    _OEE_BINS = np.array([65, 85])
+    _OEE_EMOJI = np.array(["🔴", "🟡", "🟢"])
+    
     def __init__(self):
         self.available_tools = {
             "query_asset_health": self._query_asset_health,
@@ -49,8 +115,7 @@ class IntelligenceToolExecutor:
             String result of tool execution
         """
         try:
-            tool_name = tool_call.get("name") or tool_call.get("function", {}).get("name")
-            tool_params = tool_call.get("parameters") or tool_call.get("function", {}).get("arguments", {})
+            tool_name, tool_params = self._resolve_tool_call(tool_call)
             
             if not tool_name:
                 return "❌ Tool call missing name"
@@ -71,6 +136,57 @@ class IntelligenceToolExecutor:
             logger.error(error_msg)
             return error_msg
     
+    @staticmethod
+    def _resolve_tool_call(tool_call: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Extract tool name and parameters from a direct or OpenAI-style tool call.
+        
+        OpenAI-style calls nest both under "function" and pass "arguments" as a
+        JSON string, so string arguments are decoded here.
+        """
+        tool_name = tool_call.get("name")
+        tool_params = tool_call.get("parameters")
+        
+        function = tool_call.get("function")
+        if function:
+            tool_name = tool_name or function.get("name")
+            tool_params = tool_params or function.get("arguments")
+        
+        if isinstance(tool_params, str):
+            tool_params = json.loads(tool_params) if tool_params.strip() else {}
+        
+        return tool_name, tool_params or {}
+    
+    def execute_tools_parallel(self, tool_calls: List[Dict[str, Any]],
+                               max_workers: int = MAX_TOOL_WORKERS) -> List[str]:
+        """
+        Execute independent tool calls concurrently.
+        
+        Tools are I/O bound (Snowflake queries), so running them on a thread pool
+        makes a multi-tool turn cost roughly the slowest call instead of the sum.
+        
+        Args:
+            tool_calls: List of tool call dictionaries from the agent
+            max_workers: Maximum number of concurrent tool threads
+            
+        Returns:
+            Tool results in the same order as tool_calls
+        """
+        if len(tool_calls) <= 1:
+            return [self._execute_tool_safely(tool_call) for tool_call in tool_calls]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tool_calls))) as executor:
+            futures = [executor.submit(self._execute_tool_safely, tool_call) for tool_call in tool_calls]
+            return [future.result() for future in futures]
+    
+    def _execute_tool_safely(self, tool_call: Dict[str, Any]) -> str:
+        """Execute a tool, turning any unexpected exception into an error result."""
+        try:
+            return self.execute_tool(tool_call)
+        except Exception as e:
+            logger.error(f"Tool execution failed: {str(e)}")
+            return f"Tool execution failed: {str(e)}"
+    
     def _query_asset_health(self, params: Dict[str, Any]) -> str:
         """Query asset health information"""
         try:
@@ -113,26 +229,21 @@ class IntelligenceToolExecutor:
             if len(df) == 0:
                 return "No asset health data found"
             
-            result = "🏥 **Asset Health Status:**\n\n"
-            for idx, row in df.iterrows():
-                health_score = row['HEALTH_SCORE']
-                failure_risk = row['FAILURE_RISK']
-                
-                # Determine status emoji
-                if health_score >= 90:
-                    status_emoji = "✅"
-                elif health_score >= 70:
-                    status_emoji = "⚠️"
-                else:
-                    status_emoji = "🚨"
-                
-                result += f"{status_emoji} **{row['ASSET_NAME']}**\n"
-                result += f"   • Health Score: {health_score:.1f}%\n"
-                result += f"   • Failure Risk: {failure_risk:.3f}\n"
-                result += f"   • Model: {row['MODEL']} ({row['OEM_NAME']})\n"
-                result += f"   • Downtime Impact: ${row['DOWNTIME_IMPACT_PER_HOUR']:,.2f}/hour\n\n"
+            # Determine status emoji for all rows at once (missing scores rank lowest)
+            df['STATUS_EMOJI'] = self._HEALTH_EMOJI[
+                np.digitize(df['HEALTH_SCORE'].fillna(0).to_numpy(), self._HEALTH_BINS)
+            ]
             
-            return result
+            entries = [
+                f"{row.STATUS_EMOJI} **{row.ASSET_NAME}**\n"
+                f"   • Health Score: {row.HEALTH_SCORE:.1f}%\n"
+                f"   • Failure Risk: {row.FAILURE_RISK:.3f}\n"
+                f"   • Model: {row.MODEL} ({row.OEM_NAME})\n"
+                f"   • Downtime Impact: ${row.DOWNTIME_IMPACT_PER_HOUR:,.2f}/hour\n\n"
+                for row in df.itertuples(index=False)
+            ]
+            
+            return "🏥 **Asset Health Status:**\n\n" + "".join(entries)
             
         except Exception as e:
             return f"❌ Failed to query asset health: {str(e)}"
@@ -149,7 +260,8 @@ class IntelligenceToolExecutor:
             # In a real implementation, this would integrate with the CMMS system
             # For now, we'll simulate creating a work order
             
-            work_order_id = f"WO-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            now = datetime.now()
+            work_order_id = f"WO-{now.strftime('%Y%m%d%H%M%S')}"
             
             # Log the work order creation (in real system, this would insert into database)
             logger.info(f"Creating work order {work_order_id} for asset {asset_id}")
@@ -160,7 +272,7 @@ class IntelligenceToolExecutor:
             result += f"• **Type:** {work_type}\n"
             result += f"• **Priority:** {priority}\n"
             result += f"• **Description:** {description}\n"
-            result += f"• **Created:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            result += f"• **Created:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
             result += f"• **Status:** Pending Assignment\n\n"
             result += f"📧 Work order has been submitted to the maintenance team."
             
@@ -196,26 +308,25 @@ class IntelligenceToolExecutor:
             if len(df) == 0:
                 return f"✅ No assets predicted to fail within {days_ahead} days (threshold: {threshold})"
             
-            result = f"⚠️ **Assets at Risk of Failure (Next {days_ahead} days):**\n\n"
-            total_risk_value = 0
-            
-            for idx, row in df.iterrows():
-                failure_prob = row['AVG_FAILURE_PROBABILITY']
-                rul_days = row['MIN_RUL_DAYS']
-                impact = row['DOWNTIME_IMPACT_PER_HOUR']
-                
-                risk_level = "🚨 Critical" if failure_prob > 0.8 else "⚠️ High" if failure_prob > 0.6 else "🟡 Medium"
-                
-                result += f"{risk_level} **{row['ASSET_NAME']}**\n"
-                result += f"   • Failure Probability: {failure_prob:.1%}\n"
-                result += f"   • Remaining Useful Life: {rul_days} days\n"
-                result += f"   • Potential Impact: ${impact:,.2f}/hour\n\n"
-                
-                total_risk_value += failure_prob * impact
-            
-            result += f"💰 **Total Risk Value:** ${total_risk_value:,.2f}/hour potential impact"
+            # Tier risk levels and total exposure column-wise
+            df['RISK_LEVEL'] = self._RISK_LEVELS[
+                np.digitize(df['AVG_FAILURE_PROBABILITY'].fillna(0).to_numpy(), self._RISK_BINS, right=True)
+            ]
+            total_risk_value = (df['AVG_FAILURE_PROBABILITY'] * df['DOWNTIME_IMPACT_PER_HOUR']).sum()
+            
+            entries = [
+                f"{row.RISK_LEVEL} **{row.ASSET_NAME}**\n"
+                f"   • Failure Probability: {row.AVG_FAILURE_PROBABILITY:.1%}\n"
+                f"   • Remaining Useful Life: {row.MIN_RUL_DAYS} days\n"
+                f"   • Potential Impact: ${row.DOWNTIME_IMPACT_PER_HOUR:,.2f}/hour\n\n"
+                for row in df.itertuples(index=False)
+            ]
             
-            return result
+            return (
+                f"⚠️ **Assets at Risk of Failure (Next {days_ahead} days):**\n\n"
+                + "".join(entries)
+                + f"💰 **Total Risk Value:** ${total_risk_value:,.2f}/hour potential impact"
+            )
             
         except Exception as e:
             return f"❌ Failed to get failure predictions: {str(e)}"
@@ -231,6 +342,7 @@ class IntelligenceToolExecutor:
                 return "❌ No asset IDs provided for scheduling"
             
             scheduled_items = []
+            schedule_date_str = datetime.now().strftime('%Y%m%d')
             
             for asset_id in asset_ids:
                 # Get asset info
@@ -246,7 +358,7 @@ class IntelligenceToolExecutor:
                     scheduled_items.append({
                         'asset_id': asset_id,
                         'asset_name': asset_name,
-                        'schedule_id': f"PM-{datetime.now().strftime('%Y%m%d')}-{asset_id}"
+                        'schedule_id': f"PM-{schedule_date_str}-{asset_id}"
                     })
             
             if not scheduled_items:
@@ -298,19 +410,23 @@ class IntelligenceToolExecutor:
             if len(df) == 0:
                 return f"No maintenance history found for the last {days_back} days"
             
-            result = f"🔧 **Maintenance History (Last {days_back} days):**\n\n"
+            # Derive the per-row indicator and note preview column-wise
+            df = df.assign(
+                FAILURE_INDICATOR=df['FAILURE_FLAG'].fillna(False).astype(bool).map({True: "🚨 ", False: ""}),
+                NOTES_PREVIEW=df['TECHNICIAN_NOTES'].fillna('').astype(str).str[:100],
+            )
             
-            for idx, row in df.iterrows():
-                failure_indicator = "🚨 " if row['FAILURE_FLAG'] else ""
-                result += f"{failure_indicator}**{row['ASSET_NAME']}** - {row['COMPLETED_DATE']}\n"
-                result += f"   • Type: {row['WO_TYPE_NAME']}\n"
-                result += f"   • Downtime: {row['DOWNTIME_HOURS']} hours\n"
-                result += f"   • Cost: ${row['TOTAL_COST']:,.2f}\n"
-                if row['TECHNICIAN_NOTES']:
-                    result += f"   • Notes: {row['TECHNICIAN_NOTES'][:100]}...\n"
-                result += "\n"
+            entries = [
+                f"{row.FAILURE_INDICATOR}**{row.ASSET_NAME}** - {row.COMPLETED_DATE}\n"
+                f"   • Type: {row.WO_TYPE_NAME}\n"
+                f"   • Downtime: {row.DOWNTIME_HOURS} hours\n"
+                f"   • Cost: ${row.TOTAL_COST:,.2f}\n"
+                + (f"   • Notes: {row.NOTES_PREVIEW}...\n" if row.NOTES_PREVIEW else "")
+                + "\n"
+                for row in df.itertuples(index=False)
+            ]
             
-            return result
+            return f"🔧 **Maintenance History (Last {days_back} days):**\n\n" + "".join(entries)
             
         except Exception as e:
             return f"❌ Failed to get maintenance history: {str(e)}"
@@ -387,23 +503,25 @@ class IntelligenceToolExecutor:
             if len(df) == 0:
                 return f"No OEE data available for the last {days_back} days"
             
-            result = f"📊 **OEE Metrics (Last {days_back} days):**\n\n"
+            # Convert rates to percentages and compute OEE for all rows at once
+            df['AVAILABILITY'] = df['AVAILABILITY'] * 100
+            df['QUALITY_RATE'] = df['QUALITY_RATE'] * 100
+            df['PERFORMANCE_RATE'] = df['PERFORMANCE_RATE'] * 100
+            df['OEE'] = (df['AVAILABILITY'] * df['QUALITY_RATE'] * df['PERFORMANCE_RATE']) / 10000
+            df['OEE_STATUS'] = self._OEE_EMOJI[
+                np.digitize(df['OEE'].fillna(0).to_numpy(), self._OEE_BINS)
+            ]
             
-            for idx, row in df.iterrows():
-                availability = row['AVAILABILITY'] * 100
-                quality = row['QUALITY_RATE'] * 100
-                performance = row['PERFORMANCE_RATE'] * 100
-                oee = (availability * quality * performance) / 10000
-                
-                oee_status = "🟢" if oee >= 85 else "🟡" if oee >= 65 else "🔴"
-                
-                result += f"{oee_status} **{row['ASSET_NAME']}** ({row['LINE_NAME']})\n"
-                result += f"   • Overall OEE: {oee:.1f}%\n"
-                result += f"   • Availability: {availability:.1f}%\n"
-                result += f"   • Quality: {quality:.1f}%\n"
-                result += f"   • Performance: {performance:.1f}%\n\n"
+            entries = [
+                f"{row.OEE_STATUS} **{row.ASSET_NAME}** ({row.LINE_NAME})\n"
+                f"   • Overall OEE: {row.OEE:.1f}%\n"
+                f"   • Availability: {row.AVAILABILITY:.1f}%\n"
+                f"   • Quality: {row.QUALITY_RATE:.1f}%\n"
+                f"   • Performance: {row.PERFORMANCE_RATE:.1f}%\n\n"
+                for row in df.itertuples(index=False)
+            ]
             
-            return result
+            return f"📊 **OEE Metrics (Last {days_back} days):**\n\n" + "".join(entries)
             
         except Exception as e:
             return f"❌ Failed to get OEE metrics: {str(e)}"
@@ -416,13 +534,14 @@ class IntelligenceToolExecutor:
             message = params.get("message", "Immediate attention required")
             
             # In a real system, this would integrate with alerting systems
-            alert_id = f"ALERT-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            now = datetime.now()
+            alert_id = f"ALERT-{now.strftime('%Y%m%d%H%M%S')}"
             
             result = f"🚨 **Maintenance Alert Triggered**\n\n"
             result += f"• **Alert ID:** {alert_id}\n"
             result += f"• **Type:** {alert_type}\n"
             result += f"• **Message:** {message}\n"
-            result += f"• **Timestamp:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            result += f"• **Timestamp:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
             
             if asset_ids:
                 result += f"• **Assets Affected:** {len(asset_ids)} assets\n"
@@ -439,6 +558,22 @@ class IntelligenceToolExecutor:
             return f"❌ Failed to trigger alert: {str(e)}"
 
 
+# Global tool executor instance (stateless, shared by all agents)
+_tool_executor: Optional[IntelligenceToolExecutor] = None
+_tool_executor_lock = threading.Lock()
+
+def _get_tool_executor() -> IntelligenceToolExecutor:
+    """Get or create the global tool executor instance"""
+    global _tool_executor
+    
+    if _tool_executor is None:
+        with _tool_executor_lock:
+            if _tool_executor is None:
+                _tool_executor = IntelligenceToolExecutor()
+    
+    return _tool_executor
+
+
 class SnowflakeIntelligenceAgent:
     """
     Snowflake Intelligence Agent client - similar to CortexAnalyst but for Intelligence agents.
@@ -454,52 +589,97 @@ class SnowflakeIntelligenceAgent:
         self.verify_ssl = verify_ssl
         
         self.base_url = get_base_url(account)
+        self._session = build_http_session(verify_ssl)
+        
+        # Cortex Agent REST API run endpoint
+        # Format: POST /api/v2/databases/{database}/schemas/{schema}/agents/{agent_name}:run
+        self._endpoint = f"/api/v2/databases/snowflake_intelligence/schemas/agents/agents/{agent_name.split('.')[-1]}:run"
         
-        # Initialize tool executor
-        self.tool_executor = IntelligenceToolExecutor()
+        # Shared tool executor (holds no per-agent state)
+        self.tool_executor = _get_tool_executor()
         
         # Thread management for context
         self._thread_id = None
         
+        # First (variation number, transport) that succeeded, reused on later turns
+        self._working_variation: Optional[Tuple[int, str]] = None
+        
         # Optional connection name for SNOWFLAKE_CONNECTIONS_<NAME>_TOKEN
         self.connection_name = st.secrets.get("features", {}).get("connection_name") if hasattr(st, "secrets") else None
+        
+        # PAT cache, refreshed after TOKEN_TTL_SECONDS or on an auth error
+        self._token: Optional[str] = None
+        self._token_fetched_at: float = 0.0
+        
+        # Request headers per Accept type, rebuilt only when the token changes
+        self._headers: Dict[str, dict] = {}
+        self._headers_token: Optional[str] = None
     
     def _get_valid_token(self) -> str:
-        """Get PAT from configured sources."""
-        return get_pat_token(self.connection_name)
+        """Get PAT from configured sources, reusing the cached token while fresh."""
+        now = time.monotonic()
+        if self._token is None or now - self._token_fetched_at > TOKEN_TTL_SECONDS:
+            self._token = get_pat_token(self.connection_name)
+            self._token_fetched_at = now
+        return self._token
+    
+    def _get_headers(self, accept: str) -> dict:
+        """Get request headers for the given Accept type, reusing them while the token is unchanged."""
+        token = self._get_valid_token()
+        if token != self._headers_token:
+            self._headers = {}
+            self._headers_token = token
+        
+        headers = self._headers.get(accept)
+        if headers is None:
+            headers = self._headers[accept] = build_snowflake_headers(token, accept=accept)
+        return headers
+    
+    def _invalidate_token(self, status_code: int) -> None:
+        """Drop the cached PAT when the API rejects it so the next call re-resolves it."""
+        if status_code in (401, 403):
+            self._token = None
     
     def _make_api_request(self, endpoint: str, data: dict) -> Tuple[dict, Optional[str]]:
         """Make API request to Snowflake Intelligence Agent"""
+        response, error, _ = self._post_api_request(endpoint, data)
+        return response, error
+    
+    def _post_api_request(self, endpoint: str, data: dict) -> Tuple[dict, Optional[str], Optional[int]]:
+        """
+        Make API request to Snowflake Intelligence Agent, also returning the HTTP status
+        (None if no response arrived). The status travels with the result rather than
+        being stored on the shared client, so concurrent requests can't mix them up.
+        """
+        status_code = None
         try:
-            token = self._get_valid_token()
-            headers = build_snowflake_headers(token, accept='application/json')
+            headers = self._get_headers('application/json')
             url = f"{self.base_url}{endpoint}"
             
-            print(f"🧠 INTELLIGENCE AGENT REQUEST DEBUG:")
-            print(f"Agent: {self.agent_name}")
-            print(f"URL: {url}")
-            print(f"Request Body: {json.dumps(data, indent=2)}")
-            print("=" * 50)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🧠 Intelligence Agent request - agent: %s, url: %s, body: %s",
+                             self.agent_name, url, json.dumps(data, indent=2))
             
-            response = requests.post(
-                url, headers=headers, json=data, 
+            response = self._session.post(
+                url, headers=headers, data=_json_dumps(data), 
                 timeout=API_TIMEOUT, verify=self.verify_ssl
             )
+            status_code = response.status_code
             
-            print(f"🧠 INTELLIGENCE AGENT RESPONSE DEBUG:")
-            print(f"Status Code: {response.status_code}")
-            print(f"Response Content: {response.text[:500]}...")
-            print("=" * 50)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🧠 Intelligence Agent response - status: %s, content: %s...",
+                             response.status_code, response.text[:500])
             
             if response.status_code < 400:
-                return response.json(), None
+                return _json_loads(response.content), None, status_code
             else:
-                error_data = response.json() if response.content else {}
+                self._invalidate_token(response.status_code)
+                error_data = _json_loads(response.content) if response.content else {}
                 error_msg = f"🚨 Intelligence Agent API Error - Status: {response.status_code}, Message: {error_data.get('message', 'Unknown')}"
-                return error_data, error_msg
+                return error_data, error_msg, status_code
                 
         except Exception as e:
-            return {}, f"🚨 Intelligence Agent request failed: {str(e)}"
+            return {}, f"🚨 Intelligence Agent request failed: {str(e)}", status_code
     
     def _get_or_create_thread_id(self) -> str:
         """Get existing thread ID or create a new one for context management."""
@@ -513,113 +693,132 @@ class SnowflakeIntelligenceAgent:
                 response, error = self._make_api_request("/api/v2/cortex/threads", thread_data)
                 if not error and "thread_id" in response:
                     self._thread_id = response["thread_id"]
-                    print(f"🧵 Created new thread: {self._thread_id}")
+                    logger.debug("🧵 Created new thread: %s", self._thread_id)
                 else:
                     # Fallback to a simple UUID-like string
                     import uuid
                     self._thread_id = str(uuid.uuid4())
-                    print(f"🧵 Using fallback thread ID: {self._thread_id}")
+                    logger.debug("🧵 Using fallback thread ID: %s", self._thread_id)
             except Exception as e:
                 # Fallback to a simple UUID-like string
                 import uuid
                 self._thread_id = str(uuid.uuid4())
-                print(f"🧵 Thread creation failed, using fallback: {self._thread_id}")
+                logger.debug("🧵 Thread creation failed, using fallback: %s", self._thread_id)
         
         return self._thread_id
     
     def _make_streaming_api_request(self, endpoint: str, data: dict) -> Tuple[dict, Optional[str]]:
         """Make API request and handle streaming response from Intelligence Agent."""
+        response, error = self._open_streaming_request(endpoint, data)
+        if error:
+            return {}, error
+        
+        # Parse streaming response
+        return self._parse_streaming_response(response), None
+    
+    def _open_streaming_request(self, endpoint: str, data: dict) -> Tuple[Optional[requests.Response], Optional[str]]:
+        """Start a streaming request, returning the open response without reading the body."""
         try:
-            token = self._get_valid_token()
-            headers = build_snowflake_headers(token, accept='text/event-stream')
+            headers = self._get_headers('text/event-stream')
             url = f"{self.base_url}{endpoint}"
             
-            print(f"🧠 INTELLIGENCE AGENT REQUEST DEBUG:")
-            print(f"Agent: {self.agent_name}")
-            print(f"URL: {url}")
-            print(f"Request Body: {json.dumps(data, indent=2)}")
-            print("=" * 50)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🧠 Intelligence Agent streaming request - agent: %s, url: %s, body: %s",
+                             self.agent_name, url, json.dumps(data, indent=2))
             
-            response = requests.post(
-                url, headers=headers, json=data, 
+            response = self._session.post(
+                url, headers=headers, data=_json_dumps(data), 
                 timeout=API_TIMEOUT, verify=self.verify_ssl, stream=True
             )
-            
-            print(f"🧠 INTELLIGENCE AGENT RESPONSE DEBUG:")
-            print(f"Status Code: {response.status_code}")
+            logger.debug("🧠 Intelligence Agent streaming response - status: %s", response.status_code)
             
             if response.status_code < 400:
-                # Parse streaming response
-                return self._parse_streaming_response(response), None
+                return response, None
             else:
+                self._invalidate_token(response.status_code)
                 error_content = response.text[:500] if response.text else "No content"
-                print(f"Response Content: {error_content}...")
-                print("=" * 50)
+                logger.debug("Response Content: %s...", error_content)
                 
                 error_msg = f"🚨 Intelligence Agent API Error - Status: {response.status_code}"
-                return {}, error_msg
+                return None, error_msg
                 
         except Exception as e:
-            return {}, f"🚨 Intelligence Agent streaming request failed: {str(e)}"
+            return None, f"🚨 Intelligence Agent streaming request failed: {str(e)}"
     
     def _parse_streaming_response(self, response) -> dict:
         """Parse Server-Sent Events streaming response from Intelligence Agent."""
+        events = self._iter_streaming_response(response)
+        while True:
+            try:
+                next(events)
+            except StopIteration as done:
+                return done.value
+    
+    def _iter_streaming_response(self, response) -> Generator[str, None, dict]:
+        """
+        Walk a Server-Sent Events response, yielding answer text deltas as they
+        arrive. The parsed response dict is the generator's return value.
+        """
         content_parts = []
         status = "unknown"
         thinking_content = []
         final_response = ""
         tools_executed = []
+        event_type = None
         
         try:
-            print(f"🧠 Parsing streaming response...")
+            logger.debug("🧠 Parsing streaming response...")
             
             for line in response.iter_lines(decode_unicode=True):
                 if line.startswith('data: '):
                     data_str = line[6:]  # Remove 'data: ' prefix
                     if data_str.strip():
                         try:
-                            data = json.loads(data_str)
+                            data = _json_loads(data_str)
+                            if not isinstance(data, dict):
+                                continue
                             
                             # Handle different event types
                             if 'status' in data:
                                 status = data['status']
-                                print(f"🧠 Agent status: {status}")
+                                logger.debug("🧠 Agent status: %s", status)
                             
                             # Handle thinking delta (reasoning process)
                             if 'text' in data and 'content_index' in data:
                                 thinking_content.append(data['text'])
+                                if event_type == TEXT_DELTA_EVENT:
+                                    yield data['text']
                             
                             # Handle final message content
-                            if 'content' in data:
-                                if isinstance(data['content'], list):
-                                    for item in data['content']:
-                                        if isinstance(item, dict):
-                                            if item.get('type') == 'text':
+                            match data.get('content'):
+                                case str() as text:
+                                    content_parts.append(text)
+                                case list() as items:
+                                    for item in items:
+                                        match item:
+                                            case {'type': 'text'}:
                                                 content_parts.append(item.get('text', ''))
-                                            elif item.get('type') == 'tool_calls':
+                                            case {'type': 'tool_calls'}:
                                                 tools_executed.append(item)
-                                elif isinstance(data['content'], str):
-                                    content_parts.append(data['content'])
                             
                             # Handle direct message responses
-                            if 'message' in data and isinstance(data['message'], dict):
-                                if 'content' in data['message']:
-                                    final_response = data['message']['content']
+                            match data.get('message'):
+                                case {'content': message_content}:
+                                    final_response = message_content
                             
                             # Handle response content directly
-                            if 'response' in data:
-                                if isinstance(data['response'], dict) and 'content' in data['response']:
-                                    final_response = data['response']['content']
-                                elif isinstance(data['response'], str):
-                                    final_response = data['response']
+                            match data.get('response'):
+                                case {'content': response_content}:
+                                    final_response = response_content
+                                case str() as response_text:
+                                    final_response = response_text
                             
-                        except json.JSONDecodeError:
-                            # Skip invalid JSON lines
+                        except ValueError:
+                            # Skip invalid JSON lines (json and orjson decode errors are ValueErrors)
                             continue
                 elif line.startswith('event: '):
-                    # Log event types for debugging
                     event_type = line[7:]  # Remove 'event: ' prefix
-                    print(f"🧠 Event type: {event_type}")
+                    logger.debug("🧠 Event type: %s", event_type)
             
             # Combine all content sources in priority order
             if final_response:
@@ -633,8 +832,9 @@ class SnowflakeIntelligenceAgent:
             else:
                 response_text = "I've processed your request successfully."
             
-            print(f"🧠 Final parsed response length: {len(response_text)} characters")
-            print(f"🧠 Response preview: {response_text[:200]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🧠 Final parsed response length: %d characters, preview: %s...",
+                             len(response_text), response_text[:200])
             
             return {
                 "message": {
@@ -647,7 +847,7 @@ class SnowflakeIntelligenceAgent:
             }
             
         except Exception as e:
-            print(f"🚨 Error parsing streaming response: {str(e)}")
+            logger.error(f"🚨 Error parsing streaming response: {str(e)}")
             return {
                 "message": {
                     "content": "I apologize, but I encountered an error processing the response. Please try again.",
@@ -656,6 +856,53 @@ class SnowflakeIntelligenceAgent:
                 "status": "error"
             }
 
+    @staticmethod
+    def _backoff_delay(attempt: int, status_code: Optional[int]) -> float:
+        """
+        Seconds to wait before the next attempt, or 0 when the last failure (status_code,
+        None for a network error) won't improve by waiting (e.g. 400/401/404).
+        """
+        if status_code is not None and status_code not in RETRYABLE_STATUS_CODES:
+            return 0.0
+        return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.8, 1.2)
+    
+    def _send_request(self, endpoint: str, data: dict, transport: str) -> Tuple[dict, Optional[str]]:
+        """Send a request over the given transport ('stream' or 'regular')."""
+        if transport == "stream":
+            return self._make_streaming_api_request(endpoint, data)
+        return self._make_api_request(endpoint, data)
+    
+    def _build_request_variations(self, latest_user_message: str) -> List[dict]:
+        """
+        Build the request bodies to try, in order, for a user message.
+        
+        Based on Snowflake documentation, Intelligence Agents expect messages
+        with thread_id and parent_message_id for context management; the
+        simpler forms are kept as fallbacks.
+        """
+        thread_id = self._get_or_create_thread_id()
+        structured_messages = [
+            {
+                "role": "user",
+                "content": [{"type": "text", "text": latest_user_message}]
+            }
+        ]
+        
+        return [
+            # Variation 1: With thread_id and parent_message_id
+            {"messages": structured_messages, "thread_id": thread_id, "parent_message_id": "0"},
+            # Variation 2: Without thread management (simpler)
+            {"messages": structured_messages},
+            # Variation 3: With just thread_id
+            {"messages": structured_messages, "thread_id": thread_id},
+            # Variation 4: Different message format
+            {
+                "messages": [{"role": "user", "content": latest_user_message}],
+                "thread_id": thread_id,
+                "parent_message_id": "0"
+            }
+        ]
+    
     def get_agent_response(self, messages: List[Dict]) -> Tuple[dict, Optional[str]]:
         """
         Get response from Snowflake Intelligence Agent.
@@ -670,203 +917,285 @@ class SnowflakeIntelligenceAgent:
         if not latest_user_message:
             return {}, "No user message found in conversation"
         
-        # Based on Snowflake documentation, Intelligence Agents expect this format
-        # with thread_id and parent_message_id for context management
-        # Let's try a few variations to see what works
+        request_variations = self._build_request_variations(latest_user_message)
+        endpoint = self._endpoint
         
-        base_request = {
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [{"type": "text", "text": latest_user_message}]
-                }
-            ]
-        }
+        logger.debug("🧠 Calling Intelligence Agent API...")
         
-        # Try different combinations of required fields
-        request_variations = [
-            # Variation 1: With thread_id and parent_message_id
-            {
-                **base_request,
-                "thread_id": self._get_or_create_thread_id(),
-                "parent_message_id": "0"
-            },
-            # Variation 2: Without thread management (simpler)
-            base_request,
-            # Variation 3: With just thread_id
-            {
-                **base_request,
-                "thread_id": self._get_or_create_thread_id()
-            },
-            # Variation 4: Different message format
-            {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": latest_user_message
-                    }
-                ],
-                "thread_id": self._get_or_create_thread_id(),
-                "parent_message_id": "0"
-            }
-        ]
-        
-        print(f"🧠 Calling Intelligence Agent API...")
-        # Use the correct Cortex Agent REST API endpoint structure
-        # Format: POST /api/v2/databases/{database}/schemas/{schema}/agents/{agent_name}:run
-        endpoint = f"/api/v2/databases/snowflake_intelligence/schemas/agents/agents/{self.agent_name.split('.')[-1]}:run"
+        # Skip the probe loop when a variation already worked on a previous turn
+        if self._working_variation is not None:
+            i, transport = self._working_variation
+            # Sent once: an agent :run appends to the thread, so it is not safe to hedge or duplicate
+            response, error = self._send_request(endpoint, request_variations[i - 1], transport)
+            
+            if not error:
+                return response, None
+            
+            logger.debug("❌ Cached request variation %d (%s) failed, re-probing: %s", i, transport, error)
+            self._working_variation = None
         
         # Try each variation
         for i, request_body in enumerate(request_variations, 1):
-            print(f"🧠 Trying request variation {i}: {json.dumps(request_body, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🧠 Trying request variation %d: %s", i, json.dumps(request_body, indent=2))
             
             # First try streaming request
             response, error = self._make_streaming_api_request(endpoint, request_body)
             
             if not error:
-                print(f"✅ Request variation {i} succeeded with streaming!")
+                logger.debug("✅ Request variation %d succeeded with streaming!", i)
+                self._working_variation = (i, "stream")
                 return response, None
             else:
-                print(f"❌ Request variation {i} failed with streaming: {error}")
+                logger.debug("❌ Request variation %d failed with streaming: %s", i, error)
                 
                 # If streaming fails, try regular API request as fallback
-                print(f"🔄 Trying variation {i} with regular API request...")
-                response, error = self._make_api_request(endpoint, request_body)
+                logger.debug("🔄 Trying variation %d with regular API request...", i)
+                response, error, status_code = self._post_api_request(endpoint, request_body)
                 
                 if not error:
-                    print(f"✅ Request variation {i} succeeded with regular API!")
+                    logger.debug("✅ Request variation %d succeeded with regular API!", i)
+                    self._working_variation = (i, "regular")
                     return response, None
                 else:
-                    print(f"❌ Request variation {i} also failed with regular API: {error}")
+                    logger.debug("❌ Request variation %d also failed with regular API: %s", i, error)
                     
                 if i < len(request_variations):
-                    print(f"🔄 Trying next variation...")
+                    delay = self._backoff_delay(i - 1, status_code)
+                    if delay:
+                        logger.debug("⏳ Retryable failure, backing off %.2fs", delay)
+                        time.sleep(delay)
+                    logger.debug("🔄 Trying next variation...")
                     continue
         
         return {}, f"All request variations failed. Last error: {error}"
 
+    def _response_cache_key(self, messages: List[Dict]) -> Optional[str]:
+        """
+        Build a cache key from the agent name and the whole normalized conversation, so a
+        follow-up ("and for plant 2?") only matches the same question asked in the same context.
+        """
+        if not any(msg["role"] == "user" for msg in messages):
+            return None
+        key_source = "\x00".join(
+            [self.agent_name] + [f"{msg['role']}\x01{' '.join(str(msg['content']).lower().split())}" for msg in messages]
+        )
+        return hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _session_response_cache() -> Optional[Dict[str, Tuple[str, float]]]:
+        """
+        The response cache, key -> (response_text, cached_at), kept in oldest-first order.
+        It lives in session_state rather than on this process-wide client, so answers are
+        never shared between users or sessions. None outside a Streamlit script run.
+        """
+        try:
+            return st.session_state.setdefault(RESPONSE_CACHE_SESSION_KEY, {})
+        except Exception:
+            return None
+    
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        """Return a cached response if present and not expired."""
+        session_cache = self._session_response_cache()
+        entry = session_cache.pop(key, None) if session_cache is not None else None
+        if entry is None:
+            return None
+        
+        response_text, cached_at = entry
+        if time.monotonic() - cached_at > RESPONSE_CACHE_TTL_SECONDS:
+            return None
+        
+        # Re-insert as the most recently used entry
+        session_cache[key] = entry
+        return response_text
+    
+    def _cache_response(self, key: str, response_text: str) -> None:
+        """Store a response, evicting the least recently used entries beyond the max size."""
+        session_cache = self._session_response_cache()
+        if session_cache is None:
+            return
+        session_cache.pop(key, None)
+        session_cache[key] = (response_text, time.monotonic())
+        while len(session_cache) > RESPONSE_CACHE_MAXSIZE:
+            del session_cache[next(iter(session_cache))]
+    
+    def invalidate_response_cache(self) -> None:
+        """Drop all cached responses for this session (e.g. after data changes)."""
+        session_cache = self._session_response_cache()
+        if session_cache is not None:
+            session_cache.clear()
+    
     def get_complete_response(self, messages: List[Dict]) -> Tuple[str, Optional[str]]:
         """Get complete Intelligence Agent response with tool execution."""
         
-        print("🧠 Getting response from Intelligence Agent...")
+        # Nothing to answer - skip the network round trip entirely
+        if not messages or messages[-1].get("role") != "user":
+            return "", None
+        
+        cache_key = self._response_cache_key(messages)
+        if cache_key:
+            cached_response = self._get_cached_response(cache_key)
+            if cached_response is not None:
+                logger.debug("⚡ Serving Intelligence Agent response from cache")
+                return cached_response, None
+        
+        logger.debug("🧠 Getting response from Intelligence Agent...")
         response, error = self.get_agent_response(messages)
         
         if error:
             return "", error
         
-        # Process Intelligence Agent response
+        response_text = self._extract_response_text(response)
+        
+        # Responses that ran tools had side effects, so they must not be replayed
+        tools_executed = isinstance(response, dict) and response.get("tools")
+        if cache_key and response_text and not tools_executed:
+            self._cache_response(cache_key, response_text)
+        
+        return response_text, None
+    
+    def stream_complete_response(self, messages: List[Dict]) -> Iterator[str]:
+        """
+        Yield the agent's answer in chunks as it streams, for st.write_stream.
+        
+        Streams only once a streaming request variation is known to work;
+        otherwise (or if opening the stream fails) the complete response is
+        fetched and yielded as a single chunk. Raises RuntimeError on failure.
+        """
+        if not messages or messages[-1].get("role") != "user":
+            return
+        
+        cache_key = self._response_cache_key(messages)
+        cached_response = self._get_cached_response(cache_key) if cache_key else None
+        if cached_response is not None:
+            yield cached_response
+            return
+        
+        response = None
+        if self._working_variation is not None and self._working_variation[1] == "stream":
+            i, _ = self._working_variation
+            request_body = self._build_request_variations(messages[-1]["content"])[i - 1]
+            response, error = self._open_streaming_request(self._endpoint, request_body)
+            if error:
+                logger.debug("❌ Streaming variation %d failed, using complete response: %s", i, error)
+                self._working_variation = None
+        
+        if response is None:
+            response_text, error = self.get_complete_response(messages)
+            if error:
+                raise RuntimeError(error)
+            yield response_text
+            return
+        
+        streamed = False
+        events = self._iter_streaming_response(response)
+        while True:
+            try:
+                chunk = next(events)
+            except StopIteration as done:
+                parsed = done.value
+                break
+            streamed = True
+            yield chunk
+        
+        response_text = self._extract_response_text(parsed)
+        if not streamed:
+            # No text deltas were sent (e.g. the answer only arrived as a final event)
+            yield response_text
+        
+        if cache_key and response_text and parsed.get("status") != "error" and not parsed.get("tools"):
+            self._cache_response(cache_key, response_text)
+    
+    def _extract_response_text(self, response: Any) -> str:
+        """Extract the response text from an Intelligence Agent response payload."""
         if isinstance(response, dict):
             if "message" in response:
                 # Extract content from message
                 message = response["message"]
                 if isinstance(message, dict) and "content" in message:
-                    return message["content"], None
+                    return message["content"]
                 elif isinstance(message, str):
-                    return message, None
+                    return message
             elif "content" in response:
-                return response["content"], None
+                return response["content"]
             elif "response" in response:
-                return response["response"], None
-            else:
-                # Fallback - convert entire response to string
-                return str(response), None
-        else:
-            return str(response), None
+                return response["response"]
+        
+        # Fallback - convert entire response to string
+        return str(response)
     
     def _process_agent_response(self, agent_message: dict) -> Tuple[str, Optional[str]]:
         """Process Intelligence Agent response, including tool calls."""
         
-        text_parts = []
-        tool_calls = []
-        
-        # Extract content based on response structure
-        if isinstance(agent_message, dict):
-            if "content" in agent_message:
-                content = agent_message["content"]
-                if isinstance(content, str):
-                    text_parts.append(content)
-                elif isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, dict):
-                            if item.get("type") == "text":
-                                text_parts.append(item.get("text", ""))
-                            elif item.get("type") == "tool_call":
-                                tool_calls.append(item)
-                        elif isinstance(item, str):
-                            text_parts.append(item)
-            
-            # Check for tool calls in message
-            if "tool_calls" in agent_message:
-                tool_calls.extend(agent_message["tool_calls"])
+        # Extract text and tool calls based on response structure
+        message = AgentMessage.from_payload(agent_message)
+        text_parts = message.text_parts
+        tool_calls = message.tool_calls
         
         # Process tool calls if any
         tool_results = []
         if tool_calls:
-            print(f"🔧 Processing {len(tool_calls)} tool calls...")
-            for tool_call in tool_calls:
-                try:
-                    result = self.tool_executor.execute_tool(tool_call)
-                    tool_results.append(result)
-                except Exception as e:
-                    logger.error(f"Tool execution failed: {str(e)}")
-                    tool_results.append(f"Tool execution failed: {str(e)}")
+            logger.debug("🔧 Processing %d tool calls...", len(tool_calls))
+            tool_results = self.tool_executor.execute_tools_parallel(tool_calls)
         
         # Combine text and tool results
         interpretation = "\n\n".join(text_parts) if text_parts else "I understand your request."
         
         if tool_results:
-            formatted_results = f"{interpretation}\n\n📊 **Actions Completed:**\n\n"
-            for i, result in enumerate(tool_results, 1):
-                formatted_results += f"{i}. {result}\n\n"
-            return formatted_results, None
+            parts = [f"{interpretation}\n\n📊 **Actions Completed:**\n\n"]
+            parts.extend(f"{i}. {result}\n\n" for i, result in enumerate(tool_results, 1))
+            return "".join(parts), None
         
         return interpretation, None
     
     def _format_results(self, df: pd.DataFrame, interpretation: str) -> str:
         """Format DataFrame results for display (similar to Cortex Analyst)."""
-        formatted = f"**{interpretation}**\n\n📊 **Query Results ({len(df)} assets found):**\n\n"
+        parts = [f"**{interpretation}**\n\n📊 **Query Results ({len(df)} assets found):**\n\n"]
         
-        for idx, row in df.head(10).iterrows():
-            formatted += f"**{idx + 1}. {row.get('ASSET_NAME', 'Asset')}**\n"
-            formatted += f"   • Model: {row.get('MODEL', 'N/A')} ({row.get('OEM_NAME', 'N/A')})\n"
+        for idx, row in enumerate(df.head(10).to_dict("records"), 1):
+            parts.append(f"**{idx}. {row.get('ASSET_NAME', 'Asset')}**\n")
+            parts.append(f"   • Model: {row.get('MODEL', 'N/A')} ({row.get('OEM_NAME', 'N/A')})\n")
             if 'AVG_FAILURE_PROB' in row:
-                formatted += f"   • Risk Score: {row.get('AVG_FAILURE_PROB', 0):.3f} failure probability\n"
+                parts.append(f"   • Risk Score: {row['AVG_FAILURE_PROB']:.3f} failure probability\n")
             if 'AVG_HEALTH_SCORE' in row:
-                formatted += f"   • Health Score: {row.get('AVG_HEALTH_SCORE', 0):.1f}%\n"
+                parts.append(f"   • Health Score: {row['AVG_HEALTH_SCORE']:.1f}%\n")
             if 'DOWNTIME_IMPACT_PER_HOUR' in row:
-                formatted += f"   • Downtime Impact: ${row.get('DOWNTIME_IMPACT_PER_HOUR', 0):,.2f}/hour\n"
-            formatted += "\n"
+                parts.append(f"   • Downtime Impact: ${row['DOWNTIME_IMPACT_PER_HOUR']:,.2f}/hour\n")
+            parts.append("\n")
         
         if len(df) > 10:
-            formatted += f"... and {len(df) - 10} more assets\n"
+            parts.append(f"... and {len(df) - 10} more assets\n")
         
-        return formatted
+        return "".join(parts)
 
 
 # Global Intelligence client instance
 _intelligence_client: Optional[SnowflakeIntelligenceAgent] = None
+_intelligence_lock = threading.Lock()
 
 def _get_intelligence_client() -> SnowflakeIntelligenceAgent:
     """Get or create the global Intelligence client instance"""
     global _intelligence_client
     
     if _intelligence_client is None:
-        config = st.secrets["snowflake"]
+        with _intelligence_lock:
+            if _intelligence_client is None:
+                config = st.secrets["snowflake"]
 
-        verify_ssl = get_verify_ssl(config.get("verify_ssl", True))
+                verify_ssl = get_verify_ssl(config.get("verify_ssl", True))
 
-        # Get agent name from config
-        agent_name = st.secrets.get("features", {}).get(
-            "intelligence_agent", 
-            "SNOWFLAKE_INTELLIGENCE.AGENTS.HYPERFORGE_PREDICTIVE_MAINTENANCE_AGENT"
-        )
-        
-        _intelligence_client = SnowflakeIntelligenceAgent(
-            account=config["account"],
-            user=config["user"],
-            agent_name=agent_name,
-            role=config.get("role"),
-            verify_ssl=verify_ssl
-        )
+                # Get agent name from config
+                agent_name = st.secrets.get("features", {}).get(
+                    "intelligence_agent", 
+                    "SNOWFLAKE_INTELLIGENCE.AGENTS.HYPERFORGE_PREDICTIVE_MAINTENANCE_AGENT"
+                )
+                
+                _intelligence_client = SnowflakeIntelligenceAgent(
+                    account=config["account"],
+                    user=config["user"],
+                    agent_name=agent_name,
+                    role=config.get("role"),
+                    verify_ssl=verify_ssl
+                )
     
     return _intelligence_client
@@ -1,16 +1,130 @@
 import streamlit as st
+import atexit
 import logging
+import queue
+import threading
 import time
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterator, Callable
+from collections import OrderedDict
 from datetime import datetime
-from .cortex_analyst import SnowflakeCortexAnalyst, _get_cortex_client
-from .snowflake_intelligence import SnowflakeIntelligenceAgent, _get_intelligence_client
+from functools import lru_cache
 from .conversation_manager import get_conversation_manager
-from .assistant_ui_components import SUGGESTED_QUESTIONS, get_contextual_suggestions
+# Backend clients and suggestion/feedback components are imported where first used,
+# so a page only loads the backend it is configured for
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Message roles forwarded to the assistant backends
+API_ROLES = frozenset({"user", "assistant"})
+
+# Circuit breaker: after this many consecutive Intelligence failures, go straight
+# to the Cortex fallback for CIRCUIT_OPEN_SECONDS, then let one probe through
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 30.0
+
+# Cortex Analyst api_content payloads kept per conversation (older turns lose theirs)
+MAX_ARTIFACTS = 5
+
+# Appended to answers served by the Cortex fallback
+FALLBACK_NOTE = "\n\n*Note: Response provided by Cortex Analyst (Intelligence Agent temporarily unavailable)*"
+
+# Feedback clicks are logged off the click handler, up to this many per log line
+FEEDBACK_LOG_BATCH_SIZE = 10
+
+# Maps a semantic model path onto a session-state-safe key suffix in one pass
+_KEY_TRANS = str.maketrans({"/": "_", ".": "_"})
+
+# Joins prompts that are coalesced into a single assistant turn
+PROMPT_SEPARATOR = "\n\n"
+
+
+@lru_cache(maxsize=1)
+def _feature_flags() -> Optional[Dict]:
+    """The [features] secrets section, read once per process (None if secrets are unavailable)."""
+    try:
+        return dict(st.secrets.get("features", {}))
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=1)
+def _debug_flags() -> Dict:
+    """The [debug] secrets section, read once per process."""
+    try:
+        return dict(st.secrets.get("debug", {}))
+    except Exception:
+        return {}
+
+
+def _load_intelligence_client():
+    """The shared Intelligence Agent client (imports the backend on first use)."""
+    from .snowflake_intelligence import _get_intelligence_client
+    return _get_intelligence_client()
+
+
+def _load_cortex_client():
+    """The shared Cortex Analyst client (imports the backend on first use)."""
+    from .cortex_analyst import _get_cortex_client
+    return _get_cortex_client()
+
+
+class _CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    
+    CLOSED lets every call through. After failure_threshold failures in a row it
+    goes OPEN and rejects calls for reset_timeout_s, then HALF_OPEN admits a single
+    probe: success closes the circuit again, failure re-opens it. A probe that never
+    reports back is given up on after reset_timeout_s, and another one is admitted.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout_s: float = CIRCUIT_OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a call may go through now (claims the probe slot when half-open)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout_s:
+                self.state = self.HALF_OPEN
+                self._probe_started_at = now
+                return True
+            if self.state == self.HALF_OPEN and now - self._probe_started_at >= self.reset_timeout_s:
+                # The previous probe never recorded an outcome (abandoned stream, rerun) - admit another
+                self._probe_started_at = now
+                return True
+            # OPEN within the timeout, or a half-open probe still in flight
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Intelligence Agent circuit opened for {self.reset_timeout_s:.0f}s after {self.failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
 class UnifiedAssistant:
     """
     Unified interface that routes between Snowflake Intelligence Agent (primary)
@@ -20,25 +134,86 @@ class UnifiedAssistant:
     def __init__(self):
         self.use_intelligence = self._get_feature_flag()
         self.fallback_to_cortex = self._get_fallback_flag()
+        
+        # Debug display toggles, resolved once for the widget to read per rerun
+        debug_flags = _debug_flags()
+        self.show_backend = bool(debug_flags.get("show_backend", False))
+        self.show_metrics = bool(debug_flags.get("show_metrics", False))
         self.intelligence_client = None
         self.cortex_client = None
+        self._cortex_ready = threading.Event()
+        
+        # Circuit breaker for the Intelligence Agent
+        self._intel_breaker = _CircuitBreaker()
+        
+        # Backends in the order they are tried, decided once from the feature flags
+        self._backends: List[Tuple[str, Callable]] = []
+        if self.use_intelligence:
+            self._backends.append(("Intelligence Agent", self._intelligence_backend))
+            if self.fallback_to_cortex:
+                self._backends.append(("Cortex Analyst", self._cortex_fallback_backend))
+        else:
+            self._backends.append(("Cortex Analyst", self._cortex_backend))
+        
+        # Client warm-up is started by start_warm_up once the widget has rendered
+        self._warm_up_started = False
+        self._warm_up_lock = threading.Lock()
         
         logger.info(f"UnifiedAssistant initialized - Intelligence: {self.use_intelligence}, Fallback: {self.fallback_to_cortex}")
     
+    def start_warm_up(self):
+        """
+        Build the backend clients on a background thread, once per process. Called after the
+        widget has rendered, so the lazily imported backends stay off the page-load path.
+        """
+        with self._warm_up_lock:
+            if self._warm_up_started:
+                return
+            self._warm_up_started = True
+        threading.Thread(target=self._warm_clients, daemon=True).start()
+    
+    def _warm_clients(self):
+        """
+        Create the configured backend clients ahead of the first question (background thread).
+        Failures are left to the lazy getters, which surface them per request.
+        """
+        if self.use_intelligence:
+            try:
+                self.intelligence_client = _load_intelligence_client()
+            except Exception as e:
+                logger.warning(f"Could not pre-initialize Intelligence Agent client: {str(e)}")
+            
+            if self.fallback_to_cortex:
+                self._warm_cortex_client()
+        else:
+            self._warm_cortex_client()
+            if self.cortex_client is not None:
+                # Cortex is the only backend - route straight to it from now on
+                self.get_complete_response = self._cortex_only_fast_path
+    
+    def _warm_cortex_client(self):
+        """Create the Cortex Analyst client, ignoring errors (retried lazily on use)."""
+        try:
+            self.cortex_client = _load_cortex_client()
+        except Exception as e:
+            logger.warning(f"Could not pre-initialize Cortex Analyst client: {str(e)}")
+        finally:
+            self._cortex_ready.set()
+    
     def _get_feature_flag(self) -> bool:
         """Check if Intelligence should be used (config-driven)"""
-        try:
-            return st.secrets.get("features", {}).get("use_intelligence", True)
-        except Exception:
+        flags = _feature_flags()
+        if flags is None:
             # Default to Cortex if secrets not available
             return False
+        return flags.get("use_intelligence", True)
     
     def _get_fallback_flag(self) -> bool:
         """Check if automatic fallback to Cortex is enabled"""
-        try:
-            return st.secrets.get("features", {}).get("fallback_to_cortex", True)
-        except Exception:
+        flags = _feature_flags()
+        if flags is None:
             return True
+        return flags.get("fallback_to_cortex", True)
     
     def get_complete_response(self, messages: List[Dict], semantic_model_path: str) -> Tuple[str, Optional[str], Optional[List]]:
         """
@@ -52,55 +227,160 @@ class UnifiedAssistant:
             Tuple of (response_text, error_message, api_content)
         """
         
+        # Nothing to answer (duplicate rerun or stale state) - don't call either backend
+        if not messages or messages[-1].get("role") != "user":
+            return "", None, None
+        
+        return self._run_backends(self._backends, messages, semantic_model_path, [])
+    
+    def _cortex_only_fast_path(self, messages: List[Dict], semantic_model_path: str) -> Tuple[str, Optional[str], Optional[List]]:
+        """get_complete_response when Intelligence is disabled and the Cortex client is already built."""
+        if not messages or messages[-1].get("role") != "user":
+            return "", None, None
+        return self.cortex_client.get_complete_response(messages, semantic_model_path)
+    
+    def stream_complete_response(self, messages: List[Dict], semantic_model_path: str) -> Iterator[str]:
+        """
+        Streaming variant of get_complete_response for use with st.write_stream.
+        
+        Intelligence Agent text is yielded as it arrives. If the agent fails before
+        producing any text, the usual Cortex fallback runs and its response is
+        yielded in one chunk. Errors are raised as RuntimeError.
+        """
+        if not messages or messages[-1].get("role") != "user":
+            return
+        
+        backends = self._backends
+        errors = []
         if self.use_intelligence:
+            # Stream the primary backend here; only the remaining chain runs below
+            backends = backends[1:]
+            if self._intelligence_circuit_open():
+                logger.info("⚡ Intelligence Agent circuit open, skipping to Cortex Analyst")
+                errors.append(("Intelligence Agent", self._circuit_open_error()))
+            else:
+                streamed = False
+                recorded = False
+                try:
+                    logger.info("🧠 Streaming Intelligence Agent response...")
+                    if self.intelligence_client is None:
+                        self.intelligence_client = _load_intelligence_client()
+                    for chunk in self.intelligence_client.stream_complete_response(messages):
+                        streamed = True
+                        yield chunk
+                    self._record_intelligence_result(success=True)
+                    recorded = True
+                    return
+                except Exception as e:
+                    self._record_intelligence_result(success=False)
+                    recorded = True
+                    if streamed:
+                        raise
+                    logger.warning(f"Intelligence Agent failed: {str(e)}")
+                    errors.append(("Intelligence Agent", e))
+                finally:
+                    if not recorded:
+                        # Stream abandoned (GeneratorExit) or interrupted by a rerun/stop
+                        self._record_intelligence_result(success=False)
+        
+        response, error, _ = self._run_backends(backends, messages, semantic_model_path, errors)
+        if error:
+            raise RuntimeError(error)
+        yield response
+    
+    def _run_backends(self, backends: List[Tuple[str, Callable]], messages: List[Dict], semantic_model_path: str,
+                      errors: List[Tuple[str, Exception]]) -> Tuple[str, Optional[str], Optional[List]]:
+        """Try each (name, backend) in order, returning the first answer; errors collects the failures."""
+        for name, backend in backends:
             try:
-                logger.info("🧠 Attempting Intelligence Agent response...")
-                response, error = self._get_intelligence_response(messages)
-                return response, error, None  # Intelligence Agent doesn't return api_content
+                return backend(messages, semantic_model_path)
             except Exception as e:
-                logger.warning(f"Intelligence Agent failed: {str(e)}")
-                
-                if self.fallback_to_cortex:
-                    logger.info("🔄 Falling back to Cortex Analyst...")
-                    try:
-                        response, error, api_content = self._get_cortex_response(messages, semantic_model_path)
-                        if not error:
-                            # Add fallback indicator to response
-                            fallback_note = "\n\n*Note: Response provided by Cortex Analyst (Intelligence Agent temporarily unavailable)*"
-                            response = response + fallback_note
-                        return response, error, api_content
-                    except Exception as cortex_error:
-                        return "", f"🚨 Both Intelligence Agent and Cortex Analyst failed. Intelligence: {str(e)}, Cortex: {str(cortex_error)}", None
-                else:
-                    return "", f"🚨 Intelligence Agent failed: {str(e)}", None
+                logger.warning(f"{name} failed: {str(e)}")
+                errors.append((name, e))
+        
+        if len(errors) == 1:
+            name, error = errors[0]
+            return "", f"🚨 {name} failed: {str(error)}", None
+        return "", "🚨 All backends failed. " + ", ".join(f"{name}: {str(error)}" for name, error in errors), None
+    
+    def _intelligence_circuit_open(self) -> bool:
+        """True while recent Intelligence failures mean requests should go straight to Cortex."""
+        return self.fallback_to_cortex and not self._intel_breaker.allow()
+    
+    def _circuit_open_error(self) -> Exception:
+        return RuntimeError(f"circuit open after {self._intel_breaker.failures} consecutive failures")
+    
+    def _record_intelligence_result(self, success: bool):
+        """Update the circuit breaker after an Intelligence Agent call."""
+        if success:
+            self._intel_breaker.record_success()
         else:
-            logger.info("🔍 Using Cortex Analyst (Intelligence disabled)")
-            return self._get_cortex_response(messages, semantic_model_path)
+            self._intel_breaker.record_failure()
+    
+    def _intelligence_backend(self, messages: List[Dict], semantic_model_path: str) -> Tuple[str, Optional[str], Optional[List]]:
+        """Primary backend: the Intelligence Agent, behind the circuit breaker."""
+        if self._intelligence_circuit_open():
+            logger.info("⚡ Intelligence Agent circuit open, skipping to Cortex Analyst")
+            raise self._circuit_open_error()
+        
+        logger.info("🧠 Attempting Intelligence Agent response...")
+        try:
+            response, error = self._get_intelligence_response(messages)
+            if error:
+                # The client reports failures as a returned error; treat them like a raised one so
+                # the breaker counts them and _run_backends moves on to the Cortex fallback
+                raise RuntimeError(error)
+        except BaseException:
+            # Includes Streamlit's rerun/stop signals, so a half-open probe always reports back
+            self._record_intelligence_result(success=False)
+            raise
+        self._record_intelligence_result(success=True)
+        return response, None, None  # Intelligence Agent doesn't return api_content
+    
+    def _cortex_backend(self, messages: List[Dict], semantic_model_path: str) -> Tuple[str, Optional[str], Optional[List]]:
+        """Cortex Analyst as the only backend (Intelligence disabled)."""
+        logger.info("🔍 Using Cortex Analyst (Intelligence disabled)")
+        return self._get_cortex_response(messages, semantic_model_path)
+    
+    def _cortex_fallback_backend(self, messages: List[Dict], semantic_model_path: str) -> Tuple[str, Optional[str], Optional[List]]:
+        """Cortex Analyst after an Intelligence Agent failure, with the fallback note on success."""
+        logger.info("🔄 Falling back to Cortex Analyst...")
+        response, error, api_content = self._get_cortex_response(messages, semantic_model_path)
+        if not error:
+            # Add fallback indicator to response
+            response = "".join((response, FALLBACK_NOTE))
+        return response, error, api_content
     
     def _get_intelligence_response(self, messages: List[Dict]) -> Tuple[str, Optional[str]]:
         """Get response from Snowflake Intelligence Agent"""
         if self.intelligence_client is None:
-            self.intelligence_client = _get_intelligence_client()
+            self.intelligence_client = _load_intelligence_client()
         
         return self.intelligence_client.get_complete_response(messages)
     
     def _get_cortex_response(self, messages: List[Dict], semantic_model_path: str) -> Tuple[str, Optional[str], Optional[List]]:
         """Get response from Cortex Analyst (fallback)"""
         if self.cortex_client is None:
-            self.cortex_client = _get_cortex_client()
+            # Give an in-flight background warm-up a moment before building it here
+            self._cortex_ready.wait(timeout=0.1)
+        if self.cortex_client is None:
+            self.cortex_client = _load_cortex_client()
         
         return self.cortex_client.get_complete_response(messages, semantic_model_path)
 
 
 # Global unified client instance
 _unified_client: Optional[UnifiedAssistant] = None
+_unified_lock = threading.Lock()
 
 def _get_unified_client() -> UnifiedAssistant:
     """Get or create the global unified client instance"""
     global _unified_client
     
     if _unified_client is None:
-        _unified_client = UnifiedAssistant()
+        with _unified_lock:
+            if _unified_client is None:
+                _unified_client = UnifiedAssistant()
     
     return _unified_client
 
@@ -128,14 +408,16 @@ def build_unified_widget(
         st.error(f"Failed to initialize assistant: {e}")
         return
 
-    messages_key = f"unified_messages_{semantic_model_path.replace('/', '_').replace('.', '_')}"
+    messages_key = _messages_key(semantic_model_path)
+    api_messages_key = f"{messages_key}_api"
     
     if messages_key not in st.session_state:
-        st.session_state[messages_key] = [{
-            "role": "assistant",
-            "content": initial_message,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }]
+        _reset_messages(messages_key, initial_message)
+    elif api_messages_key not in st.session_state:
+        # Session predates the API view - build it once from the full history
+        st.session_state[api_messages_key] = [
+            _api_message(msg) for msg in st.session_state[messages_key] if msg["role"] in API_ROLES
+        ]
     
     # Header with title and controls
     if enable_conversation_controls:
@@ -147,7 +429,7 @@ def build_unified_widget(
         st.subheader(title)
         
         # Show backend indicator in debug mode
-        if st.secrets.get("debug", {}).get("show_backend", False):
+        if client.show_backend:
             backend = "Intelligence Agent" if client.use_intelligence else "Cortex Analyst"
             st.caption(f"🔧 Backend: {backend}")
     
@@ -174,25 +456,24 @@ def build_unified_widget(
                     st.session_state["confirm_clear"] = True
                     st.toast("Click again to confirm clearing conversation")
                 else:
-                    st.session_state[messages_key] = [{
-                        "role": "assistant",
-                        "content": initial_message,
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }]
+                    _reset_messages(messages_key, initial_message)
                     conv_manager.clear_conversation(conversation_id)
                     st.session_state["confirm_clear"] = False
                     st.rerun()
     
     st.divider()
     
-    # Suggested questions section (collapsible, starts collapsed)
+    # Suggested questions section (collapsible, starts collapsed); held in a slot so it can be
+    # cleared once this run adds a turn, without a rerun
+    suggestions_slot = st.empty()
     if enable_suggested_questions and len(st.session_state[messages_key]) <= 2:
-        with st.expander("💡 Need inspiration? Try these questions:", expanded=False):
-            _render_suggested_questions(
-                messages_key=messages_key,
-                page_context=page_context
-            )
-        st.divider()
+        with suggestions_slot.container():
+            with st.expander("💡 Need inspiration? Try these questions:", expanded=False):
+                _render_suggested_questions(
+                    messages_key=messages_key,
+                    page_context=page_context
+                )
+            st.divider()
     
     # Messages container
     messages_container = st.container()
@@ -201,38 +482,55 @@ def build_unified_widget(
         # Display conversation history
         for i, message in enumerate(st.session_state[messages_key]):
             with st.chat_message(message["role"]):
-                st.markdown(message["content"], unsafe_allow_html=True)
+                has_html = message.get("_has_html")
+                if has_html is None:
+                    # Messages from sessions that predate the flag
+                    has_html = message["_has_html"] = _has_html(message["content"])
+                st.markdown(message["content"], unsafe_allow_html=has_html)
                 
                 # Optional: Add feedback buttons for assistant messages
                 if message["role"] == "assistant" and i > 0:
                     _render_feedback_buttons(f"msg_{i}")
     
-    # Check for pending question from suggested questions
-    pending_question = st.session_state.get("pending_question")
-    if pending_question:
-        del st.session_state["pending_question"]
-        prompt = pending_question
+    # The chat input is always rendered, so a run that answers a suggested question still ends with it
+    typed_prompt = st.chat_input(placeholder)
+    
+    # The widget is on screen - warm the backend clients (no-op after the first run)
+    client.start_warm_up()
+    
+    # Check for pending questions from suggested questions (clicks queued since the last run)
+    pending_questions = st.session_state.pop("pending_question", None)
+    if isinstance(pending_questions, str):
+        pending_questions = [pending_questions]
+    if pending_questions:
+        prompt = PROMPT_SEPARATOR.join(pending_questions)
     else:
-        prompt = st.chat_input(placeholder)
+        prompt = typed_prompt
     
     # Process the prompt (either from chat input or suggested question)
     if prompt:
+        # The conversation is no longer empty; drop the suggestions rendered above
+        suggestions_slot.empty()
         start_time = time.time()
+        # One timestamp per turn (second precision) for every message it adds
+        now_str = _timestamp()
         
-        # Add user message
-        user_message = {
-            "role": "user",
-            "content": prompt,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        st.session_state[messages_key].append(user_message)
-        
-        # Save to conversation manager
-        conv_manager.save_message(
-            conversation_id=conversation_id,
-            role="user",
-            content=prompt
-        )
+        if st.session_state[messages_key][-1]["role"] == "user":
+            # The previous prompt's run was interrupted by this one before it was
+            # answered - coalesce both into a single turn instead of two backend calls
+            for history in (st.session_state[messages_key], st.session_state[api_messages_key]):
+                history[-1]["content"] = PROMPT_SEPARATOR.join((history[-1]["content"], prompt))
+            st.session_state[messages_key][-1]["_has_html"] = _has_html(st.session_state[messages_key][-1]["content"])
+        else:
+            # Add user message
+            user_message = {
+                "role": "user",
+                "content": prompt,
+                "timestamp": now_str
+            }
+            _append_message(messages_key, user_message)
+        # The user turn as sent to the backend (merged when prompts were coalesced), for persistence
+        user_content = st.session_state[messages_key][-1]["content"]
         
         # Display the user message immediately
         with messages_container:
@@ -243,17 +541,24 @@ def build_unified_widget(
             with st.chat_message("assistant"):
                 with st.spinner("🤖 Thinking..."):
                     try:
-                        # Prepare messages for API
-                        api_messages = []
-                        for msg in st.session_state[messages_key]:
-                            if msg["role"] in ["user", "assistant"]:
-                                api_messages.append(msg)
-                        
                         # Get response from unified client
-                        assistant_response, error_msg, api_content = client.get_complete_response(
-                            api_messages,
-                            semantic_model_path
-                        )
+                        streamed = client.use_intelligence
+                        if streamed:
+                            # Render Intelligence Agent text as it arrives instead of after completion
+                            api_content = None
+                            try:
+                                assistant_response = st.write_stream(client.stream_complete_response(
+                                    st.session_state[api_messages_key],
+                                    semantic_model_path
+                                )) or ""
+                                error_msg = None
+                            except RuntimeError as stream_error:
+                                assistant_response, error_msg = "", str(stream_error)
+                        else:
+                            assistant_response, error_msg, api_content = client.get_complete_response(
+                                st.session_state[api_messages_key],
+                                semantic_model_path
+                            )
                         
                         # Calculate response time
                         response_time_ms = int((time.time() - start_time) * 1000)
@@ -265,64 +570,148 @@ def build_unified_widget(
                         if error_msg:
                             assistant_response = error_msg
                             st.error(error_msg)
+                            streamed = False
                         elif not assistant_response or assistant_response.strip() == "":
                             assistant_response = "I apologize, but I didn't receive a proper response. Please try asking your question again."
                             st.warning("Empty response received")
                             logger.warning("Empty assistant response received")
+                            streamed = False
                         
-                        # Display the response
-                        st.markdown(assistant_response, unsafe_allow_html=True)
+                        # Display the response (already on screen if it was streamed)
+                        if not streamed:
+                            st.markdown(assistant_response, unsafe_allow_html=_has_html(assistant_response))
                         
                         # Add assistant response to session state
                         assistant_msg = {
                             "role": "assistant",
                             "content": assistant_response,
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            "timestamp": now_str,
                             "backend_used": "Intelligence Agent" if client.use_intelligence else "Cortex Analyst",
                             "response_time_ms": response_time_ms
                         }
                         if api_content:
                             assistant_msg["api_content"] = api_content
-                        st.session_state[messages_key].append(assistant_msg)
+                        _append_message(messages_key, assistant_msg)
                         
-                        # Save to conversation manager
-                        conv_manager.save_message(
-                            conversation_id=conversation_id,
-                            role="assistant",
-                            content=assistant_response,
-                            backend_used=assistant_msg["backend_used"],
-                            response_time_ms=response_time_ms
-                        )
+                        # Feedback for the new message, as the history loop would render it on the next run
+                        _render_feedback_buttons(f"msg_{len(st.session_state[messages_key]) - 1}")
+                        
+                        # Save the whole turn to the conversation manager in one write
+                        conv_manager.save_messages_batch(conversation_id, [
+                            {"role": "user", "content": user_content},
+                            {
+                                "role": "assistant",
+                                "content": assistant_response,
+                                "backend_used": assistant_msg["backend_used"],
+                                "response_time_ms": response_time_ms
+                            }
+                        ])
                         
                         # Show performance metrics in debug mode
-                        if st.secrets.get("debug", {}).get("show_metrics", False):
+                        if client.show_metrics:
                             st.caption(f"⚡ Response time: {response_time_ms}ms | Backend: {assistant_msg['backend_used']}")
 
                     except Exception as e:
                         error_msg = f"🚨 Unexpected error: {str(e)}"
                         st.error(error_msg)
-                        st.session_state[messages_key].append({
+                        conv_manager.save_message(
+                            conversation_id=conversation_id,
+                            role="user",
+                            content=user_content
+                        )
+                        _append_message(messages_key, {
                             "role": "assistant",
                             "content": error_msg,
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            "timestamp": now_str
                         })
-        
-        # Trigger a rerun to refresh the display
-        st.rerun()
+        # No st.rerun() here: the turn is already rendered in place, and the next
+        # interaction re-runs the script with the updated history anyway
+
+
+def _timestamp() -> str:
+    """Local time as 'YYYY-MM-DD HH:MM:SS', built from time.localtime() without strftime."""
+    t = time.localtime()
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+
+
+@lru_cache(maxsize=32)
+def _messages_key(semantic_model_path: str) -> str:
+    """Session-state key holding the conversation for a semantic model."""
+    return f"unified_messages_{semantic_model_path.translate(_KEY_TRANS)}"
+
+
+def _reset_messages(messages_key: str, initial_message: str):
+    """Start a conversation with the welcome message in both the display and API lists."""
+    welcome = {
+        "role": "assistant",
+        "content": initial_message,
+        "timestamp": _timestamp()
+    }
+    welcome["_has_html"] = _has_html(initial_message)
+    st.session_state[messages_key] = [welcome]
+    st.session_state[f"{messages_key}_api"] = [_api_message(welcome)]
+    st.session_state[f"{messages_key}_artifacts"] = OrderedDict()
+
+
+def _has_html(content: str) -> bool:
+    """Whether content may contain HTML and needs st.markdown's unsafe_allow_html path."""
+    return "<" in content
+
+
+def _api_message(message: Dict) -> Dict:
+    """The slim copy of a message sent to the backends (drops display-only metadata)."""
+    api_msg = {"role": message["role"], "content": message["content"]}
+    if message.get("api_content"):
+        # Cortex Analyst replays its own structured turns for follow-up questions
+        api_msg["api_content"] = message["api_content"]
+    return api_msg
+
+
+def _append_message(messages_key: str, message: Dict):
+    """Append a message to the history, keeping the API view in sync incrementally."""
+    message["_has_html"] = _has_html(message["content"])
+    # The display history only keeps a key to the (potentially large) api_content
+    api_content = message.pop("api_content", None)
+    history = st.session_state[messages_key]
+    history.append(message)
+    if message["role"] in API_ROLES:
+        api_msg = _api_message(message)
+        if api_content:
+            api_msg["api_content"] = api_content
+            message["artifact_key"] = len(history) - 1
+            _store_artifact(messages_key, message["artifact_key"], api_msg)
+        st.session_state[f"{messages_key}_api"].append(api_msg)
+
+
+def _store_artifact(messages_key: str, artifact_key: int, api_msg: Dict):
+    """Track an API message holding api_content, dropping the payload from the oldest beyond MAX_ARTIFACTS."""
+    artifacts = st.session_state.setdefault(f"{messages_key}_artifacts", OrderedDict())
+    artifacts[artifact_key] = api_msg
+    while len(artifacts) > MAX_ARTIFACTS:
+        _, evicted = artifacts.popitem(last=False)
+        evicted.pop("api_content", None)
+
+
+def _suggested_question_buttons(page_context: Optional[str]) -> List[Tuple[str, Tuple[Tuple[int, str, str], ...]]]:
+    """Suggested-question buttons per category as (category, ((index, question, key), ...))."""
+    from .assistant_ui_components import SUGGESTED_QUESTIONS, get_contextual_suggestions
+    suggestions = get_contextual_suggestions(page_context) if page_context else SUGGESTED_QUESTIONS
+    return [
+        (category, tuple((i, question, f"sq_{category}_{i}") for i, question in enumerate(questions[:4])))  # Limit to 4 per category
+        for category, questions in suggestions.items()
+    ]
 
 
 def _render_suggested_questions(messages_key: str, page_context: Optional[str] = None):
     """Render suggested questions that trigger API calls when clicked."""
-    suggestions = get_contextual_suggestions(page_context) if page_context else SUGGESTED_QUESTIONS
-    
-    for category, questions in suggestions.items():
+    for category, buttons in _suggested_question_buttons(page_context):
         st.markdown(f"**{category}**")
         cols = st.columns(2)
-        for i, question in enumerate(questions[:4]):  # Limit to 4 per category
+        for i, question, key in buttons:
             with cols[i % 2]:
-                if st.button(question, key=f"sq_{category}_{i}", use_container_width=True):
-                    # Set pending question to be processed
-                    st.session_state["pending_question"] = question
+                if st.button(question, key=key, use_container_width=True):
+                    # Queue the question; clicks landing before the next run are sent together
+                    st.session_state.setdefault("pending_question", []).append(question)
                     st.rerun()
 
 
@@ -343,15 +732,60 @@ def _render_feedback_buttons(message_id: str):
 
 def _log_feedback(message_id: str, rating: str):
     """Log feedback for continuous improvement."""
-    if "feedback_log" not in st.session_state:
-        st.session_state["feedback_log"] = []
-    
-    st.session_state["feedback_log"].append({
+    from .assistant_ui_components import feedback_log
+    feedback_log().append({
         "message_id": message_id,
         "rating": rating,
         "timestamp": datetime.now().isoformat()
     })
-    logger.info(f"Feedback logged: {message_id} - {rating}")
+    _get_feedback_queue().put((message_id, rating))
+
+
+# Background feedback logger
+_feedback_queue: Optional[queue.Queue] = None
+_feedback_lock = threading.Lock()
+
+# Put on the feedback queue to stop its drain thread
+_FEEDBACK_SHUTDOWN = object()
+
+def _get_feedback_queue() -> queue.Queue:
+    """Get the feedback queue, starting its drain thread on first use."""
+    global _feedback_queue
+    
+    if _feedback_queue is None:
+        with _feedback_lock:
+            if _feedback_queue is None:
+                feedback_queue = queue.Queue()
+                threading.Thread(target=_drain_feedback_queue, args=(feedback_queue,), daemon=True).start()
+                atexit.register(feedback_queue.put, _FEEDBACK_SHUTDOWN)
+                _feedback_queue = feedback_queue
+    
+    return _feedback_queue
+
+
+def _drain_feedback_queue(feedback_queue: queue.Queue):
+    """
+    Emit queued feedback, blocking while idle. Items already waiting behind the first are
+    logged with it, up to FEEDBACK_LOG_BATCH_SIZE per line; _FEEDBACK_SHUTDOWN stops the thread.
+    """
+    while True:
+        item = feedback_queue.get()
+        stop = item is _FEEDBACK_SHUTDOWN
+        batch = [] if stop else [item]
+        while not stop and len(batch) < FEEDBACK_LOG_BATCH_SIZE:
+            try:
+                item = feedback_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _FEEDBACK_SHUTDOWN:
+                stop = True
+            else:
+                batch.append(item)
+        
+        if batch:
+            logger.info("Feedback logged: %s", ", ".join(f"{message_id} - {rating}" for message_id, rating in batch))
+        if stop:
+            return
 
 
 # Legacy compatibility function
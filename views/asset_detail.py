@@ -31,26 +31,124 @@
 #
 # ==================================================================================================
 
+import math
+from dataclasses import dataclass
+from typing import Optional
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+from functools import lru_cache
 from utils.data_loader import run_query, run_queries_parallel
+from utils.calculations import lttb_downsample
 # Note: Cortex Analyst integration can be added later if needed
 
+# Target number of time buckets per sensor for the telemetry charts
+SENSOR_CHART_BUCKETS = 500
+
+# Metric columns plotted on the sensor charts
+SENSOR_METRIC_COLUMNS = ['TEMPERATURE_C', 'VIBRATION_MM_S', 'PRESSURE_PSI']
+
+# Points kept per sensor trace after LTTB downsampling
+CHART_POINTS_PER_TRACE = 200
+
+# Compact dtypes for the sensor metric columns
+SENSOR_METRIC_DTYPES = {col: 'float32' for col in SENSOR_METRIC_COLUMNS}
+
+# Above this many points, sensor traces are drawn as lines only
+MARKER_POINT_LIMIT = 100
+
+# Lookback window for each date range preset
+_PRESET_DELTAS = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30)
+}
+
+# Most recent maintenance records shown in the history table
+MAINTENANCE_ROW_LIMIT = 50
+
+# Column dtypes for the maintenance history table (money stays float64 so summed cents survive)
+MAINTENANCE_DTYPES = {
+    'WO_TYPE_NAME': 'string',
+    'TECHNICIAN_NAME': 'string',
+    'TECHNICIAN_NOTES': 'string',
+    'DOWNTIME_HOURS': 'float32',
+    'PARTS_COST': 'float64',
+    'LABOR_COST': 'float64'
+}
+
+# Mock hierarchy with multiple plants and lines, used when the hierarchy query returns nothing or fails
+# (built once at import; callers treat it as read-only)
+_MOCK_HIERARCHY_DF = pd.DataFrame({
+    'ASSET_ID': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
+    'ASSET_NAME': [
+        'Primary Coolant Pump', 'Conveyor Drive Motor', 'Air Compressor Unit',
+        'Hydraulic Pump System', 'Main Drive Motor', 'Cooling Fan Assembly',
+        'Assembly Robot Arm', 'Conveyor Drive System', 'Pneumatic Press Unit',
+        'Welding Robot System', 'Material Handling Motor', 'Heat Treatment Furnace'
+    ],
+    'MODEL': [
+        'HydroFlow 5000', 'IronHorse 75HP', 'CompMax 200',
+        'PowerFlow 3000', 'PowerMax 50HP', 'AeroMax 1200',
+        'FlexArm 6000', 'MegaDrive 100HP', 'PowerPress 5000',
+        'WeldMaster Pro', 'FlexDrive 80HP', 'ThermoPro 3000'
+    ],
+    'OEM_NAME': [
+        'FlowServe', 'Siemens', 'Atlas Copco',
+        'Bosch Rexroth', 'ABB', 'Ziehl-Abegg',
+        'KUKA', 'Schneider Electric', 'SMC',
+        'Fanuc', 'Rockwell', 'Despatch'
+    ],
+    'CLASS_NAME': [
+        'Rotating Equipment', 'Rotating Equipment', 'Rotating Equipment',
+        'Rotating Equipment', 'Rotating Equipment', 'Electrical Systems',
+        'Control Systems', 'Rotating Equipment', 'Static Equipment',
+        'Control Systems', 'Rotating Equipment', 'Static Equipment'
+    ],
+    'PROCESS_NAME': [
+        'Machining Operations', 'Machining Operations', 'Machining Operations',
+        'Metal Forming', 'Metal Forming', 'Metal Forming',
+        'Robotic Assembly', 'Robotic Assembly', 'Robotic Assembly',
+        'Welding Station', 'Welding Station', 'Heat Treatment'
+    ],
+    'LINE_NAME': [
+        'Production Line A', 'Production Line A', 'Production Line A',
+        'Production Line B', 'Production Line B', 'Production Line B',
+        'Assembly Line 1', 'Assembly Line 1', 'Assembly Line 1',
+        'Assembly Line 2', 'Assembly Line 2', 'Assembly Line 2'
+    ],
+    'PLANT_NAME': [
+        'Davidson Manufacturing', 'Davidson Manufacturing', 'Davidson Manufacturing',
+        'Davidson Manufacturing', 'Davidson Manufacturing', 'Davidson Manufacturing',
+        'Charlotte Assembly', 'Charlotte Assembly', 'Charlotte Assembly',
+        'Charlotte Assembly', 'Charlotte Assembly', 'Charlotte Assembly'
+    ]
+})
+
+@dataclass
+class AssetViewState:
+    """Asset Detail selections and toggles, stored as one session-state entry."""
+    plant: Optional[str] = None
+    line: Optional[str] = None
+    process: Optional[str] = None
+    asset: Optional[int] = None
+    date_range: str = '7d'
+    real_time: bool = False
+
+def _view_state():
+    """This session's AssetViewState, created on first use."""
+    return st.session_state.setdefault('asset_view', AssetViewState())
+
 def show_page():
     """Renders the Asset Detail page."""
     st.header("🔍 Asset Detail View")
     st.markdown("Comprehensive monitoring and analysis for individual assets with real-time sensor data.")
     
-    # Initialize session state for asset and date range
-    if 'selected_asset_id' not in st.session_state:
-        st.session_state.selected_asset_id = None
-    if 'selected_date_range' not in st.session_state:
-        st.session_state.selected_date_range = '7d'
-    if 'real_time_mode' not in st.session_state:
-        st.session_state.real_time_mode = False
+    # Selections and toggles for this view, kept together in session state
+    state = _view_state()
     
     # --- Control Panel ---
     st.subheader("Asset Selection & Configuration")
@@ -74,14 +172,14 @@ def show_page():
             "Time Range:",
             options=list(date_presets.keys()),
             format_func=lambda x: date_presets[x],
-            index=list(date_presets.keys()).index(st.session_state.selected_date_range)
+            index=list(date_presets.keys()).index(state.date_range)
         )
-        st.session_state.selected_date_range = date_range
+        state.date_range = date_range
     
     with control_col3:
         # Real-time toggle
-        real_time = st.toggle("Real-time", value=st.session_state.real_time_mode)
-        st.session_state.real_time_mode = real_time
+        real_time = st.toggle("Real-time", value=state.real_time)
+        state.real_time = real_time
     
     # Custom date range picker
     if date_range == 'custom':
@@ -91,50 +189,53 @@ def show_page():
         with col2:
             end_date = st.date_input("End Date", value=datetime.now())
     else:
-        # Calculate date range based on preset
-        end_date = datetime.now()
-        if date_range == '24h':
-            start_date = end_date - timedelta(hours=24)
-        elif date_range == '7d':
-            start_date = end_date - timedelta(days=7)
-        elif date_range == '30d':
-            start_date = end_date - timedelta(days=30)
+        # Calculate date range based on preset (minute resolution so reruns reuse cached queries)
+        end_date = _floor_minute(datetime.now())
+        start_date = end_date - _PRESET_DELTAS[date_range]
     
     # --- Main Content ---
     if selected_asset:
         # Load all data in parallel for better performance
         with st.spinner("Loading asset data..."):
             # Prepare queries for parallel execution
-            asset_query = get_asset_details_query(selected_asset)
+            # Details for every asset in the selected process: the query text only changes
+            # with the process, so switching assets within it is served from run_query's cache
+            asset_query = get_asset_details_batch_query(state.plant, state.line, state.process)
             sensor_query = get_sensor_data_query(selected_asset, start_date, end_date)
-            maintenance_query = get_maintenance_data_query(selected_asset, start_date, end_date)
             
-            # Execute queries in parallel
+            # Execute queries in parallel - all in one wave, so the common case (sensor data in
+            # range) costs a single round trip; maintenance is just not rendered without sensor data
             queries = {
                 'asset_details': asset_query,
                 'sensor_data': sensor_query,
-                'maintenance_data': maintenance_query
+                'maintenance_data': get_maintenance_data_query(selected_asset, start_date, end_date),
+                'maintenance_summary': get_maintenance_summary_query(selected_asset, start_date, end_date)
             }
-            results = run_queries_parallel(queries, max_workers=3)
+            results = run_queries_parallel(queries, max_workers=4)
             
             # Extract results
             asset_details_df = results['asset_details']
             sensor_data = results['sensor_data']
             maintenance_data = results['maintenance_data']
+            maintenance_summary = results['maintenance_summary']
         
         # Process asset details
-        asset_details = asset_details_df.iloc[0] if not asset_details_df.empty else None
+        asset_details_df = asset_details_df.set_index('ASSET_ID', drop=False) if not asset_details_df.empty else asset_details_df
+        asset_details = asset_details_df.loc[selected_asset] if selected_asset in asset_details_df.index else None
         
         if asset_details is not None:
             # Display asset overview
             display_asset_overview(asset_details)
             
             if not sensor_data.empty:
+                # Sensor readings don't need double precision - halves the frame and chart payload
+                sensor_data = sensor_data.astype(SENSOR_METRIC_DTYPES)
+                
                 # Display sensor monitoring dashboard
                 display_sensor_dashboard(sensor_data, asset_details)
                 
                 # Display maintenance history
-                display_maintenance_history_from_data(maintenance_data)
+                display_maintenance_history_from_data(maintenance_data, maintenance_summary)
             else:
                 st.warning(f"No sensor data available for asset {selected_asset} in the selected time range.")
         else:
@@ -142,92 +243,90 @@ def show_page():
     else:
         st.info("Please select an asset to view detailed information.")
 
+def _floor_minute(dt):
+    """Truncate a datetime to the start of its minute."""
+    return dt.replace(second=0, microsecond=0)
+
 def display_hierarchical_asset_selection():
     """Display hierarchical asset selection (Plant → Line → Process → Asset)."""
     st.markdown("**Asset Selection**")
     
-    # Initialize session state for hierarchy
-    if 'selected_plant' not in st.session_state:
-        st.session_state.selected_plant = None
-    if 'selected_line' not in st.session_state:
-        st.session_state.selected_line = None
-    if 'selected_process' not in st.session_state:
-        st.session_state.selected_process = None
-    if 'selected_asset' not in st.session_state:
-        st.session_state.selected_asset = None
+    state = _view_state()
     
-    # Get hierarchy data
-    hierarchy_data = get_hierarchy_data()
+    # Get hierarchy data as plant -> line -> process -> assets (errors are handled here, outside
+    # the cache, so the mock fallback is never cached and the next run retries the query)
+    try:
+        hierarchy_index = get_hierarchy_index()
+    except Exception as e:
+        st.warning(f"Database connection issue: {str(e)}. Using mock data.")
+        hierarchy_index = _mock_hierarchy_index()
     
-    if hierarchy_data.empty:
+    if not hierarchy_index:
         st.error("No hierarchy data available")
         return None
     
     # Add reset button
     if st.button("🔄 Reset Selection", help="Clear all selections and start over"):
-        st.session_state.selected_plant = None
-        st.session_state.selected_line = None
-        st.session_state.selected_process = None
-        st.session_state.selected_asset = None
-        st.session_state.selected_asset_id = None
+        state.plant = state.line = state.process = state.asset = None
         st.rerun()
     
     # Create a visual hierarchy display
     with st.expander("🏭 Manufacturing Hierarchy", expanded=True):
         # Step 1: Plant Selection
-        plants = hierarchy_data['PLANT_NAME'].unique()
+        plants = list(hierarchy_index)
         selected_plant = st.selectbox(
             "🏭 Select Plant:",
             options=plants,
-            index=0 if st.session_state.selected_plant is None else list(plants).index(st.session_state.selected_plant) if st.session_state.selected_plant in plants else 0,
+            index=plants.index(state.plant) if state.plant in plants else 0,
             key="plant_selector"
         )
-        st.session_state.selected_plant = selected_plant
+        state.plant = selected_plant
         
         # Step 2: Line Selection (filtered by plant)
         if selected_plant:
-            plant_data = hierarchy_data[hierarchy_data['PLANT_NAME'] == selected_plant]
-            lines = plant_data['LINE_NAME'].unique()
+            plant_lines = hierarchy_index[selected_plant]
+            lines = list(plant_lines)
             
             selected_line = st.selectbox(
                 "📏 Select Production Line:",
                 options=lines,
-                index=0 if st.session_state.selected_line is None else list(lines).index(st.session_state.selected_line) if st.session_state.selected_line in lines else 0,
+                index=lines.index(state.line) if state.line in lines else 0,
                 key="line_selector"
             )
-            st.session_state.selected_line = selected_line
+            state.line = selected_line
             
             # Step 3: Process Selection (filtered by line)
             if selected_line:
-                line_data = plant_data[plant_data['LINE_NAME'] == selected_line]
-                processes = line_data['PROCESS_NAME'].unique()
+                line_processes = plant_lines[selected_line]
+                processes = list(line_processes)
                 
                 selected_process = st.selectbox(
                     "⚙️ Select Process:",
                     options=processes,
-                    index=0 if st.session_state.selected_process is None else list(processes).index(st.session_state.selected_process) if st.session_state.selected_process in processes else 0,
+                    index=processes.index(state.process) if state.process in processes else 0,
                     key="process_selector"
                 )
-                st.session_state.selected_process = selected_process
+                state.process = selected_process
                 
                 # Step 4: Asset Selection (filtered by process)
                 if selected_process:
-                    process_data = line_data[line_data['PROCESS_NAME'] == selected_process]
-                    assets = process_data[['ASSET_ID', 'ASSET_NAME', 'MODEL', 'OEM_NAME']].drop_duplicates()
+                    assets = line_processes[selected_process]
+                    assets_idx = assets.set_index('ASSET_ID')
+                    # Option labels built once instead of a boolean-mask lookup per option
+                    label_map = dict(zip(assets['ASSET_ID'], assets['ASSET_NAME'] + ' (' + assets['MODEL'] + ')'))
                     
                     selected_asset = st.selectbox(
                         "🔧 Select Asset:",
-                        options=assets['ASSET_ID'],
-                        format_func=lambda x: f"{assets[assets['ASSET_ID'] == x]['ASSET_NAME'].iloc[0]} ({assets[assets['ASSET_ID'] == x]['MODEL'].iloc[0]})",
-                        index=0 if st.session_state.selected_asset is None else list(assets['ASSET_ID']).index(st.session_state.selected_asset) if st.session_state.selected_asset in assets['ASSET_ID'].values else 0,
+                        options=assets_idx.index,
+                        format_func=label_map.get,
+                        index=assets_idx.index.get_loc(state.asset) if state.asset in assets_idx.index else 0,
                         key="asset_selector"
                     )
-                    st.session_state.selected_asset = selected_asset
-                    st.session_state.selected_asset_id = selected_asset
+                    state.asset = selected_asset
                     
                     # Display selected asset details
                     if selected_asset:
-                        asset_info = assets[assets['ASSET_ID'] == selected_asset].iloc[0]
+                        asset_info = assets_idx.loc[selected_asset]
                         st.success(f"✅ Selected: **{asset_info['ASSET_NAME']}** ({asset_info['MODEL']}) by {asset_info['OEM_NAME']}")
                     
                     return selected_asset
@@ -239,242 +338,114 @@ def display_hierarchical_asset_selection():
             return None
     
     # Display current selection path
-    if st.session_state.selected_plant:
-        st.info(f"📍 **Current Path:** {st.session_state.selected_plant} → {st.session_state.selected_line or 'Select Line'} → {st.session_state.selected_process or 'Select Process'} → {st.session_state.selected_asset or 'Select Asset'}")
+    if state.plant:
+        st.info(f"📍 **Current Path:** {state.plant} → {state.line or 'Select Line'} → {state.process or 'Select Process'} → {state.asset or 'Select Asset'}")
     
-    return st.session_state.selected_asset
+    return state.asset
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_hierarchy_data():
-    """Get complete hierarchy data for asset selection."""
-    try:
-        query = """
-            SELECT 
-                A.ASSET_ID,
-                A.ASSET_NAME,
-                A.MODEL,
-                A.OEM_NAME,
-                AC.CLASS_NAME,
-                P.PROCESS_NAME,
-                L.LINE_NAME,
-                PL.PLANT_NAME
-            FROM HYPERFORGE.SILVER.DIM_ASSET A
-            JOIN HYPERFORGE.SILVER.DIM_ASSET_CLASS AC ON A.ASSET_CLASS_ID = AC.ASSET_CLASS_ID
-            JOIN HYPERFORGE.SILVER.DIM_PROCESS P ON A.PROCESS_ID = P.PROCESS_ID
-            JOIN HYPERFORGE.SILVER.DIM_LINE L ON P.LINE_ID = L.LINE_ID
-            JOIN HYPERFORGE.SILVER.DIM_PLANT PL ON L.PLANT_ID = PL.PLANT_ID
-            WHERE A.IS_CURRENT = TRUE
-            ORDER BY PL.PLANT_NAME, L.LINE_NAME, P.PROCESS_NAME, A.ASSET_NAME
-        """
-        result = run_query(query)
-        if result.empty:
-            # Return mock hierarchy data with multiple plants and lines
-            return pd.DataFrame({
-                'ASSET_ID': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
-                'ASSET_NAME': [
-                    'Primary Coolant Pump', 'Conveyor Drive Motor', 'Air Compressor Unit',
-                    'Hydraulic Pump System', 'Main Drive Motor', 'Cooling Fan Assembly',
-                    'Assembly Robot Arm', 'Conveyor Drive System', 'Pneumatic Press Unit',
-                    'Welding Robot System', 'Material Handling Motor', 'Heat Treatment Furnace'
-                ],
-                'MODEL': [
-                    'HydroFlow 5000', 'IronHorse 75HP', 'CompMax 200',
-                    'PowerFlow 3000', 'PowerMax 50HP', 'AeroMax 1200',
-                    'FlexArm 6000', 'MegaDrive 100HP', 'PowerPress 5000',
-                    'WeldMaster Pro', 'FlexDrive 80HP', 'ThermoPro 3000'
-                ],
-                'OEM_NAME': [
-                    'FlowServe', 'Siemens', 'Atlas Copco',
-                    'Bosch Rexroth', 'ABB', 'Ziehl-Abegg',
-                    'KUKA', 'Schneider Electric', 'SMC',
-                    'Fanuc', 'Rockwell', 'Despatch'
-                ],
-                'CLASS_NAME': [
-                    'Rotating Equipment', 'Rotating Equipment', 'Rotating Equipment',
-                    'Rotating Equipment', 'Rotating Equipment', 'Electrical Systems',
-                    'Control Systems', 'Rotating Equipment', 'Static Equipment',
-                    'Control Systems', 'Rotating Equipment', 'Static Equipment'
-                ],
-                'PROCESS_NAME': [
-                    'Machining Operations', 'Machining Operations', 'Machining Operations',
-                    'Metal Forming', 'Metal Forming', 'Metal Forming',
-                    'Robotic Assembly', 'Robotic Assembly', 'Robotic Assembly',
-                    'Welding Station', 'Welding Station', 'Heat Treatment'
-                ],
-                'LINE_NAME': [
-                    'Production Line A', 'Production Line A', 'Production Line A',
-                    'Production Line B', 'Production Line B', 'Production Line B',
-                    'Assembly Line 1', 'Assembly Line 1', 'Assembly Line 1',
-                    'Assembly Line 2', 'Assembly Line 2', 'Assembly Line 2'
-                ],
-                'PLANT_NAME': [
-                    'Davidson Manufacturing', 'Davidson Manufacturing', 'Davidson Manufacturing',
-                    'Davidson Manufacturing', 'Davidson Manufacturing', 'Davidson Manufacturing',
-                    'Charlotte Assembly', 'Charlotte Assembly', 'Charlotte Assembly',
-                    'Charlotte Assembly', 'Charlotte Assembly', 'Charlotte Assembly'
-                ]
-            })
-        return result
-    except Exception as e:
-        st.warning(f"Database connection issue: {str(e)}. Using mock data.")
-        # Return mock hierarchy data for development/testing
-        return pd.DataFrame({
-            'ASSET_ID': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12],
-            'ASSET_NAME': [
-                'Primary Coolant Pump', 'Conveyor Drive Motor', 'Air Compressor Unit',
-                'Hydraulic Pump System', 'Main Drive Motor', 'Cooling Fan Assembly',
-                'Assembly Robot Arm', 'Conveyor Drive System', 'Pneumatic Press Unit',
-                'Welding Robot System', 'Material Handling Motor', 'Heat Treatment Furnace'
-            ],
-            'MODEL': [
-                'HydroFlow 5000', 'IronHorse 75HP', 'CompMax 200',
-                'PowerFlow 3000', 'PowerMax 50HP', 'AeroMax 1200',
-                'FlexArm 6000', 'MegaDrive 100HP', 'PowerPress 5000',
-                'WeldMaster Pro', 'FlexDrive 80HP', 'ThermoPro 3000'
-            ],
-            'OEM_NAME': [
-                'FlowServe', 'Siemens', 'Atlas Copco',
-                'Bosch Rexroth', 'ABB', 'Ziehl-Abegg',
-                'KUKA', 'Schneider Electric', 'SMC',
-                'Fanuc', 'Rockwell', 'Despatch'
-            ],
-            'CLASS_NAME': [
-                'Rotating Equipment', 'Rotating Equipment', 'Rotating Equipment',
-                'Rotating Equipment', 'Rotating Equipment', 'Electrical Systems',
-                'Control Systems', 'Rotating Equipment', 'Static Equipment',
-                'Control Systems', 'Rotating Equipment', 'Static Equipment'
-            ],
-            'PROCESS_NAME': [
-                'Machining Operations', 'Machining Operations', 'Machining Operations',
-                'Metal Forming', 'Metal Forming', 'Metal Forming',
-                'Robotic Assembly', 'Robotic Assembly', 'Robotic Assembly',
-                'Welding Station', 'Welding Station', 'Heat Treatment'
-            ],
-            'LINE_NAME': [
-                'Production Line A', 'Production Line A', 'Production Line A',
-                'Production Line B', 'Production Line B', 'Production Line B',
-                'Assembly Line 1', 'Assembly Line 1', 'Assembly Line 1',
-                'Assembly Line 2', 'Assembly Line 2', 'Assembly Line 2'
-            ],
-            'PLANT_NAME': [
-                'Davidson Manufacturing', 'Davidson Manufacturing', 'Davidson Manufacturing',
-                'Davidson Manufacturing', 'Davidson Manufacturing', 'Davidson Manufacturing',
-                'Charlotte Assembly', 'Charlotte Assembly', 'Charlotte Assembly',
-                'Charlotte Assembly', 'Charlotte Assembly', 'Charlotte Assembly'
-            ]
-        })
-
-def get_asset_details_query(asset_id):
-    """Return SQL query for asset details (for parallel execution)."""
-    # Note: run_queries_parallel doesn't support params, so we format the query
-    return f"""
+    """Get complete hierarchy data for asset selection (cached and read-only; raises on query errors so they are not cached)."""
+    query = """
         SELECT 
             A.ASSET_ID,
             A.ASSET_NAME,
             A.MODEL,
             A.OEM_NAME,
-            A.INSTALLATION_DATE,
-            A.DOWNTIME_IMPACT_PER_HOUR,
             AC.CLASS_NAME,
             P.PROCESS_NAME,
             L.LINE_NAME,
-            PL.PLANT_NAME,
-            G.LATEST_HEALTH_SCORE,
-            G.AVG_FAILURE_PROBABILITY,
-            G.MIN_RUL_DAYS
+            PL.PLANT_NAME
         FROM HYPERFORGE.SILVER.DIM_ASSET A
         JOIN HYPERFORGE.SILVER.DIM_ASSET_CLASS AC ON A.ASSET_CLASS_ID = AC.ASSET_CLASS_ID
         JOIN HYPERFORGE.SILVER.DIM_PROCESS P ON A.PROCESS_ID = P.PROCESS_ID
         JOIN HYPERFORGE.SILVER.DIM_LINE L ON P.LINE_ID = L.LINE_ID
         JOIN HYPERFORGE.SILVER.DIM_PLANT PL ON L.PLANT_ID = PL.PLANT_ID
-        LEFT JOIN (
-            SELECT ASSET_ID, LATEST_HEALTH_SCORE, AVG_FAILURE_PROBABILITY, MIN_RUL_DAYS
-            FROM HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH
-            QUALIFY ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY HOUR_TIMESTAMP DESC) = 1
-        ) G ON A.ASSET_ID = G.ASSET_ID
-        WHERE A.ASSET_ID = {asset_id} AND A.IS_CURRENT = TRUE
+        WHERE A.IS_CURRENT = TRUE
+        ORDER BY PL.PLANT_NAME, L.LINE_NAME, P.PROCESS_NAME, A.ASSET_NAME
     """
+    result = run_query(query)
+    if result.empty:
+        # Return mock hierarchy data with multiple plants and lines
+        return _MOCK_HIERARCHY_DF
+    return result
 
-def get_asset_details(asset_id):
-    """Get detailed information for a specific asset."""
-    try:
-        query = get_asset_details_query(asset_id)
-        result = run_query(query)
-        return result.iloc[0] if not result.empty else None
-    except Exception as e:
-        st.warning(f"Database connection issue: {str(e)}. Using mock data.")
-        # Return mock data for development/testing
-        return pd.Series({
-            'ASSET_ID': asset_id,
-            'ASSET_NAME': f'Asset {asset_id}',
-            'MODEL': 'Mock Model',
-            'OEM_NAME': 'Mock OEM',
-            'INSTALLATION_DATE': '2022-01-01',
-            'DOWNTIME_IMPACT_PER_HOUR': 5000.0,
-            'CLASS_NAME': 'Rotating Equipment',
-            'PROCESS_NAME': 'Machining Operations',
-            'LINE_NAME': 'Production Line A',
-            'PLANT_NAME': 'Davidson Manufacturing',
-            'LATEST_HEALTH_SCORE': 85.5,
-            'AVG_FAILURE_PROBABILITY': 0.15,
-            'MIN_RUL_DAYS': 120
-        })
+def _build_hierarchy_index(hierarchy_df):
+    """
+    Hierarchy as nested dicts {plant: {line: {process: assets}}}.
+    assets holds the distinct ASSET_ID/ASSET_NAME/MODEL/OEM_NAME rows; all levels keep query order.
+    """
+    hierarchy_index = {}
+    grouped = hierarchy_df.groupby(['PLANT_NAME', 'LINE_NAME', 'PROCESS_NAME'], sort=False)
+    for (plant, line, process), process_data in grouped:
+        hierarchy_index.setdefault(plant, {}).setdefault(line, {})[process] = (
+            process_data[['ASSET_ID', 'ASSET_NAME', 'MODEL', 'OEM_NAME']].drop_duplicates()
+        )
+    return hierarchy_index
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_hierarchy_index():
+    """The hierarchy index, built once per hierarchy load (raises on query errors so they are not cached)."""
+    return _build_hierarchy_index(get_hierarchy_data())
+
+@lru_cache(maxsize=1)
+def _mock_hierarchy_index():
+    """The hierarchy index for _MOCK_HIERARCHY_DF, used when the hierarchy query fails."""
+    return _build_hierarchy_index(_MOCK_HIERARCHY_DF)
+
+def get_asset_details_batch_query(plant_name, line_name, process_name):
+    """Return (sql, params) for the details of every current asset in a process (for parallel execution)."""
+    sql = """
+        SELECT 
+            ASSET_ID,
+            ASSET_NAME,
+            MODEL,
+            OEM_NAME,
+            INSTALLATION_DATE,
+            DOWNTIME_IMPACT_PER_HOUR,
+            CLASS_NAME,
+            PROCESS_NAME,
+            LINE_NAME,
+            PLANT_NAME,
+            LATEST_HEALTH_SCORE,
+            AVG_FAILURE_PROBABILITY,
+            MIN_RUL_DAYS
+        FROM HYPERFORGE.GOLD.V_ASSET_DETAIL
+        WHERE PLANT_NAME = %s
+        AND LINE_NAME = %s
+        AND PROCESS_NAME = %s
+    """
+    return sql, [plant_name, line_name, process_name]
+
+def _sensor_bucket_seconds(start_date, end_date):
+    """TIME_SLICE width that keeps the range at roughly SENSOR_CHART_BUCKETS points (at least a minute)."""
+    range_seconds = (end_date - start_date).total_seconds()
+    return max(60, math.ceil(range_seconds / SENSOR_CHART_BUCKETS))
 
 def get_sensor_data_query(asset_id, start_date, end_date):
-    """Return SQL query for sensor data (for parallel execution)."""
+    """
+    Return SQL query for sensor data (for parallel execution), averaged into time buckets server-side.
+    LATEST_* columns hold the last raw reading in each bucket for the "Current" metric cards.
+    """
+    bucket_sec = _sensor_bucket_seconds(start_date, end_date)
     return f"""
         SELECT 
-            S.SENSOR_SK,
-            S.SENSOR_NK,
             S.SENSOR_TYPE,
-            S.UNITS_OF_MEASURE,
-            T.RECORDED_AT,
-            T.TEMPERATURE_C,
-            T.VIBRATION_MM_S,
-            T.PRESSURE_PSI,
-            T.HEALTH_SCORE,
-            T.FAILURE_PROBABILITY,
-            T.RUL_DAYS,
-            T.IS_ANOMALOUS
+            TIME_SLICE(T.RECORDED_AT, {bucket_sec}, 'SECOND') AS RECORDED_AT,
+            AVG(T.TEMPERATURE_C) AS TEMPERATURE_C,
+            AVG(T.VIBRATION_MM_S) AS VIBRATION_MM_S,
+            AVG(T.PRESSURE_PSI) AS PRESSURE_PSI,
+            MAX_BY(T.TEMPERATURE_C, T.RECORDED_AT) AS LATEST_TEMPERATURE_C,
+            MAX_BY(T.VIBRATION_MM_S, T.RECORDED_AT) AS LATEST_VIBRATION_MM_S,
+            MAX_BY(T.PRESSURE_PSI, T.RECORDED_AT) AS LATEST_PRESSURE_PSI
         FROM HYPERFORGE.SILVER.DIM_SENSOR S
         JOIN HYPERFORGE.SILVER.FCT_ASSET_TELEMETRY T ON S.ASSET_ID = T.ASSET_ID
         WHERE S.ASSET_ID = {asset_id} 
         AND T.RECORDED_AT BETWEEN '{start_date}' AND '{end_date}'
-        ORDER BY T.RECORDED_AT DESC
+        GROUP BY S.SENSOR_TYPE, 2
+        ORDER BY RECORDED_AT DESC
     """
 
-def get_sensor_data(asset_id, start_date, end_date):
-    """Get sensor data for the specified asset and date range."""
-    try:
-        query = get_sensor_data_query(asset_id, start_date, end_date)
-        return run_query(query)
-    except Exception as e:
-        st.warning(f"Database connection issue: {str(e)}. Using mock data.")
-        # Return mock sensor data for development/testing
-        import numpy as np
-        from datetime import datetime, timedelta
-        
-        # Generate mock time series data
-        time_points = pd.date_range(start=start_date, end=end_date, freq='H')
-        mock_data = []
-        
-        for i, timestamp in enumerate(time_points):
-            mock_data.append({
-                'SENSOR_SK': 1,
-                'SENSOR_NK': f'sensor_{asset_id}_001',
-                'SENSOR_TYPE': 'Temperature',
-                'UNITS_OF_MEASURE': 'Celsius',
-                'RECORDED_AT': timestamp,
-                'TEMPERATURE_C': 65.0 + np.sin(i * 0.1) * 5 + np.random.normal(0, 2),
-                'VIBRATION_MM_S': 0.5 + np.sin(i * 0.2) * 0.2 + np.random.normal(0, 0.1),
-                'PRESSURE_PSI': 140.0 + np.sin(i * 0.05) * 10 + np.random.normal(0, 3),
-                'HEALTH_SCORE': max(70, 95 - i * 0.1 + np.random.normal(0, 2)),
-                'FAILURE_PROBABILITY': min(0.9, 0.1 + i * 0.001 + np.random.normal(0, 0.02)),
-                'RUL_DAYS': max(1, 200 - i * 0.5 + np.random.normal(0, 5)),
-                'IS_ANOMALOUS': np.random.random() < 0.1
-            })
-        
-        return pd.DataFrame(mock_data)
-
 def display_asset_overview(asset_details):
     """Display asset overview information."""
     if asset_details is None:
@@ -514,8 +485,22 @@ def display_asset_overview(asset_details):
     else:
         st.error("🚨 Asset requires immediate attention")
 
+@lru_cache(maxsize=32)
+def _sensor_chart_layout(sensor_type):
+    """Plotly layout for a sensor type's chart, built once (go.Figure copies it per render)."""
+    return go.Layout(
+        title=f"{sensor_type} Sensor Readings Over Time",
+        xaxis_title="Time",
+        yaxis_title="Temperature (°C)",
+        yaxis2=dict(title="Vibration (mm/s)", overlaying="y", side="right"),
+        yaxis3=dict(title="Pressure (PSI)", overlaying="y", side="right"),
+        hovermode='x unified',
+        height=400
+    )
+
+@st.fragment
 def display_sensor_dashboard(sensor_data, asset_details):
-    """Display sensor monitoring dashboard."""
+    """Display sensor monitoring dashboard (fragment - reruns without re-running the hierarchy and queries)."""
     st.subheader("Sensor Monitoring Dashboard")
     
     # Get unique sensor types for this asset
@@ -531,67 +516,69 @@ def display_sensor_dashboard(sensor_data, asset_details):
                 type_data = sensor_data[sensor_data['SENSOR_TYPE'] == sensor_type]
                 
                 if not type_data.empty:
-                    # Create time series chart
-                    fig = go.Figure()
+                    # Create time series chart on the shared per-sensor-type layout
+                    fig = go.Figure(layout=_sensor_chart_layout(sensor_type))
+                    # Millisecond timestamps serialize shorter than nanosecond ones
+                    recorded_at = type_data['RECORDED_AT'].to_numpy(dtype='datetime64[ms]')
+                    
+                    # Which metric columns have any data, in one pass over the frame
+                    metric_cols = [col for col in SENSOR_METRIC_COLUMNS if col in type_data.columns]
+                    has = type_data[metric_cols].notna().any().to_dict()
+                    # Markers add a DOM node per point - only draw them for short series
+                    mode = 'lines+markers' if len(type_data) <= MARKER_POINT_LIMIT else 'lines'
                     
                     # Add traces for different metrics
-                    if 'TEMPERATURE_C' in type_data.columns and not type_data['TEMPERATURE_C'].isna().all():
+                    if has.get('TEMPERATURE_C'):
+                        x, y = lttb_downsample(recorded_at, type_data['TEMPERATURE_C'].to_numpy(), CHART_POINTS_PER_TRACE)
                         fig.add_trace(go.Scatter(
-                            x=type_data['RECORDED_AT'],
-                            y=type_data['TEMPERATURE_C'],
-                            mode='lines+markers',
+                            x=x,
+                            y=y,
+                            mode=mode,
                             name='Temperature (°C)',
                             line=dict(color='red')
                         ))
                     
-                    if 'VIBRATION_MM_S' in type_data.columns and not type_data['VIBRATION_MM_S'].isna().all():
+                    if has.get('VIBRATION_MM_S'):
+                        x, y = lttb_downsample(recorded_at, type_data['VIBRATION_MM_S'].to_numpy(), CHART_POINTS_PER_TRACE)
                         fig.add_trace(go.Scatter(
-                            x=type_data['RECORDED_AT'],
-                            y=type_data['VIBRATION_MM_S'],
-                            mode='lines+markers',
+                            x=x,
+                            y=y,
+                            mode=mode,
                             name='Vibration (mm/s)',
                             line=dict(color='blue'),
                             yaxis='y2'
                         ))
                     
-                    if 'PRESSURE_PSI' in type_data.columns and not type_data['PRESSURE_PSI'].isna().all():
+                    if has.get('PRESSURE_PSI'):
+                        x, y = lttb_downsample(recorded_at, type_data['PRESSURE_PSI'].to_numpy(), CHART_POINTS_PER_TRACE)
                         fig.add_trace(go.Scatter(
-                            x=type_data['RECORDED_AT'],
-                            y=type_data['PRESSURE_PSI'],
-                            mode='lines+markers',
+                            x=x,
+                            y=y,
+                            mode=mode,
                             name='Pressure (PSI)',
                             line=dict(color='green'),
                             yaxis='y3'
                         ))
                     
-                    # Update layout
-                    fig.update_layout(
-                        title=f"{sensor_type} Sensor Readings Over Time",
-                        xaxis_title="Time",
-                        yaxis_title="Temperature (°C)",
-                        yaxis2=dict(title="Vibration (mm/s)", overlaying="y", side="right"),
-                        yaxis3=dict(title="Pressure (PSI)", overlaying="y", side="right"),
-                        hovermode='x unified',
-                        height=400
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                    # Stable key so reruns update the existing chart rather than mounting a new one
+                    st.plotly_chart(fig, use_container_width=True, key=f"chart_{asset_details.get('ASSET_ID')}_{sensor_type}")
                     
-                    # Display current values
-                    latest_data = type_data.iloc[0]
+                    # Display current values from the full-precision, undownsampled frame
+                    # (last raw reading of the newest bucket, not its average or an LTTB point)
+                    latest_data = type_data.loc[type_data['RECORDED_AT'].idxmax()]
                     col1, col2, col3 = st.columns(3)
                     
                     with col1:
-                        if not pd.isna(latest_data.get('TEMPERATURE_C')):
-                            st.metric("Current Temperature", f"{latest_data['TEMPERATURE_C']:.1f}°C")
+                        if not pd.isna(latest_data.get('LATEST_TEMPERATURE_C')):
+                            st.metric("Current Temperature", f"{latest_data['LATEST_TEMPERATURE_C']:.1f}°C")
                     
                     with col2:
-                        if not pd.isna(latest_data.get('VIBRATION_MM_S')):
-                            st.metric("Current Vibration", f"{latest_data['VIBRATION_MM_S']:.2f} mm/s")
+                        if not pd.isna(latest_data.get('LATEST_VIBRATION_MM_S')):
+                            st.metric("Current Vibration", f"{latest_data['LATEST_VIBRATION_MM_S']:.2f} mm/s")
                     
                     with col3:
-                        if not pd.isna(latest_data.get('PRESSURE_PSI')):
-                            st.metric("Current Pressure", f"{latest_data['PRESSURE_PSI']:.1f} PSI")
+                        if not pd.isna(latest_data.get('LATEST_PRESSURE_PSI')):
+                            st.metric("Current Pressure", f"{latest_data['LATEST_PRESSURE_PSI']:.1f} PSI")
                 else:
                     st.info(f"No data available for {sensor_type} sensors")
 
@@ -616,28 +603,63 @@ def get_maintenance_data_query(asset_id, start_date, end_date):
         WHERE ML.ASSET_ID = {asset_id}
         AND ML.COMPLETED_DATE BETWEEN '{start_date}' AND '{end_date}'
         ORDER BY ML.COMPLETED_DATE DESC
+        LIMIT {MAINTENANCE_ROW_LIMIT}
     """
 
-def display_maintenance_history_from_data(maintenance_data):
-    """Display maintenance history from pre-loaded data."""
+def get_maintenance_summary_query(asset_id, start_date, end_date):
+    """Return SQL query for the maintenance totals over the full range (for parallel execution)."""
+    return f"""
+        SELECT 
+            COALESCE(SUM(DOWNTIME_HOURS), 0)::FLOAT AS TOTAL_DOWNTIME,
+            COALESCE(SUM(PARTS_COST + LABOR_COST), 0)::FLOAT AS TOTAL_COST,
+            COUNT_IF(FAILURE_FLAG) AS FAILURE_COUNT,
+            COUNT(*) AS RECORD_COUNT
+        FROM HYPERFORGE.SILVER.FCT_MAINTENANCE_LOG
+        WHERE ASSET_ID = {asset_id}
+        AND COMPLETED_DATE BETWEEN '{start_date}' AND '{end_date}'
+    """
+
+@st.fragment
+def display_maintenance_history_from_data(maintenance_data, maintenance_summary):
+    """Display maintenance history from pre-loaded data (fragment - reruns independently)."""
     st.subheader("Maintenance History")
     
     if not maintenance_data.empty:
+        # Explicit dtypes (NUMBER columns otherwise arrive as Decimal objects) so
+        # st.dataframe's Arrow conversion skips per-value type inference
+        maintenance_data = maintenance_data.astype(MAINTENANCE_DTYPES)
+        
+        # Totals come from the SQL aggregate; fall back to the (possibly truncated) rows if it failed
+        if not maintenance_summary.empty:
+            summary = maintenance_summary.iloc[0]
+            total_downtime = summary['TOTAL_DOWNTIME']
+            total_cost = summary['TOTAL_COST']
+            failure_count = int(summary['FAILURE_COUNT'])
+            record_count = int(summary['RECORD_COUNT'])
+        else:
+            total_downtime = maintenance_data['DOWNTIME_HOURS'].sum()
+            total_cost = (maintenance_data['PARTS_COST'] + maintenance_data['LABOR_COST']).sum()
+            failure_count = int(maintenance_data['FAILURE_FLAG'].sum())
+            record_count = None
+        
         # Display maintenance summary
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            total_downtime = maintenance_data['DOWNTIME_HOURS'].sum()
             st.metric("Total Downtime", f"{total_downtime:.1f} hours")
         
         with col2:
-            total_cost = (maintenance_data['PARTS_COST'] + maintenance_data['LABOR_COST']).sum()
             st.metric("Total Cost", f"${total_cost:,.2f}")
         
         with col3:
-            failure_count = maintenance_data['FAILURE_FLAG'].sum()
             st.metric("Failure Events", f"{failure_count}")
         
+        # The table holds at most MAINTENANCE_ROW_LIMIT rows - say so when the range has more
+        if record_count is not None and record_count > len(maintenance_data):
+            st.caption(f"Showing the {len(maintenance_data)} most recent of {record_count} maintenance records.")
+        elif record_count is None and len(maintenance_data) >= MAINTENANCE_ROW_LIMIT:
+            st.caption(f"Showing the {MAINTENANCE_ROW_LIMIT} most recent maintenance records.")
+        
         # Display maintenance table
         st.dataframe(
             maintenance_data[['COMPLETED_DATE', 'WO_TYPE_NAME', 'DOWNTIME_HOURS', 'PARTS_COST', 'LABOR_COST', 'TECHNICIAN_NAME', 'TECHNICIAN_NOTES']],
@@ -13,6 +13,7 @@
 #     - This pre-aggregated table is used for high-performance loading of the most critical KPIs:
 #       - LATEST_HEALTH_SCORE
 #       - AVG_FAILURE_PROBABILITY (used to calculate Production at Risk)
+#     - Current values are read from `HYPERFORGE.GOLD.ASSET_LATEST_HEALTH` (latest row per asset).
 #   - Secondary: `HYPERFORGE.SILVER` Layer
 #     - `FCT_PRODUCTION_LOG`: Used to calculate the overall OEE and time-series trends.
 #     - `FCT_MAINTENANCE_LOG` & `DIM_WORK_ORDER_TYPE`: Used to calculate the Maintenance Cost Ratio.
@@ -30,7 +31,7 @@
 # VISUALIZATIONS:
 #   - `st.metric`: Used for top-level KPIs with delta indicators.
 #   - `plotly.graph_objects`: Used for multi-line time-series charts with secondary y-axis.
-#   - `plotly.express.line`: Used for sparklines in tables.
+#   - `st.line_chart`: Used for the lightweight KPI sparklines.
 #   - `plotly.express.pie`: Used to render the Maintenance Cost Ratio chart.
 #
 # USER INTERACTION:
@@ -41,14 +42,84 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
 from utils.data_loader import run_query, run_queries_parallel
-from utils.calculations import calculate_oee
+from utils.calculations import add_oee_columns, lttb_downsample
+
+# Point caps for charts: LTTB for the enterprise trend, a plain stride for the 80px sparklines
+TREND_MAX_POINTS = 500
+SPARKLINE_MAX_POINTS = 50
+
+# OEE ratio columns of the plant time-series
+PLANT_RATIO_COLUMNS = ['OEE', 'AVAILABILITY', 'PERFORMANCE', 'QUALITY']
+
+# Summed production columns that OEE is derived from
+PRODUCTION_SUM_COLUMNS = ['PLANNED_RUNTIME_HOURS', 'ACTUAL_RUNTIME_HOURS', 'UNITS_PRODUCED', 'UNITS_SCRAPPED']
+
+# Plant-level daily OEE time-series from a bound start date (a literal date rather than
+# CURRENT_DATE() keeps the statement text and binds stable, so Snowflake's result cache can hit)
+PLANT_TIMESERIES_QUERY = """
+    WITH plant_daily_production AS (
+        SELECT
+            P.PLANT_NAME,
+            PL.PRODUCTION_DATE,
+            SUM(PL.PLANNED_RUNTIME_HOURS) AS PLANNED_RUNTIME_HOURS,
+            SUM(PL.ACTUAL_RUNTIME_HOURS) AS ACTUAL_RUNTIME_HOURS,
+            SUM(PL.UNITS_PRODUCED) AS UNITS_PRODUCED,
+            SUM(PL.UNITS_SCRAPPED) AS UNITS_SCRAPPED
+        FROM HYPERFORGE.SILVER.FCT_PRODUCTION_LOG PL
+        JOIN HYPERFORGE.SILVER.DIM_ASSET A ON PL.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
+        JOIN HYPERFORGE.SILVER.DIM_PROCESS PR ON PR.PROCESS_ID = A.PROCESS_ID
+        JOIN HYPERFORGE.SILVER.DIM_LINE L ON PR.LINE_ID = L.LINE_ID
+        JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
+        WHERE PL.PRODUCTION_DATE >= %s
+        GROUP BY P.PLANT_NAME, PL.PRODUCTION_DATE
+    )
+    SELECT
+        PLANT_NAME,
+        PRODUCTION_DATE,
+        PLANNED_RUNTIME_HOURS,
+        ACTUAL_RUNTIME_HOURS,
+        UNITS_PRODUCED,
+        UNITS_SCRAPPED,
+        CASE WHEN PLANNED_RUNTIME_HOURS > 0 
+            THEN ACTUAL_RUNTIME_HOURS / PLANNED_RUNTIME_HOURS 
+            ELSE 0 END AS AVAILABILITY,
+        0.95 AS PERFORMANCE,
+        CASE WHEN UNITS_PRODUCED > 0 
+            THEN (UNITS_PRODUCED - UNITS_SCRAPPED) / UNITS_PRODUCED 
+            ELSE 0 END AS QUALITY,
+        CASE WHEN PLANNED_RUNTIME_HOURS > 0 AND UNITS_PRODUCED > 0
+            THEN (ACTUAL_RUNTIME_HOURS / PLANNED_RUNTIME_HOURS) * 0.95 * 
+                 ((UNITS_PRODUCED - UNITS_SCRAPPED) / UNITS_PRODUCED)
+            ELSE 0 END AS OEE
+    FROM plant_daily_production
+    ORDER BY PLANT_NAME, PRODUCTION_DATE;
+"""
+
+# Daily average asset health from a bound start date
+HEALTH_TIMESERIES_QUERY = """
+    WITH daily_health AS (
+        SELECT
+            DATE_TRUNC('DAY', HOUR_TIMESTAMP) AS HEALTH_DATE,
+            AVG(LATEST_HEALTH_SCORE) AS AVG_HEALTH_SCORE
+        FROM HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH
+        WHERE HOUR_TIMESTAMP >= %s
+        GROUP BY DATE_TRUNC('DAY', HOUR_TIMESTAMP)
+        ORDER BY HEALTH_DATE
+    )
+    SELECT 
+        HEALTH_DATE::DATE AS HEALTH_DATE,
+        AVG_HEALTH_SCORE
+    FROM daily_health;
+"""
 
 def show_page():
     """Renders the Executive Summary page."""
+    # Plotly is only needed once the page renders; import here rather than when app.py loads the views
+    import plotly.express as px
+    import plotly.graph_objects as go
     st.header("🏢 Executive Summary")
 
     # --- Time Period Configuration ---
@@ -58,133 +129,24 @@ def show_page():
     start_date = end_date - timedelta(days=days_back)
 
     # --- SQL QUERIES ---
-    
-    # 1. Enterprise-level daily OEE time-series (last 30 days)
-    enterprise_timeseries_query = f"""
-        WITH daily_production AS (
-            SELECT
-                PL.PRODUCTION_DATE,
-                SUM(PL.PLANNED_RUNTIME_HOURS) AS PLANNED_RUNTIME_HOURS,
-                SUM(PL.ACTUAL_RUNTIME_HOURS) AS ACTUAL_RUNTIME_HOURS,
-                SUM(PL.UNITS_PRODUCED) AS UNITS_PRODUCED,
-                SUM(PL.UNITS_SCRAPPED) AS UNITS_SCRAPPED
-            FROM HYPERFORGE.SILVER.FCT_PRODUCTION_LOG PL
-            WHERE PL.PRODUCTION_DATE >= DATEADD(DAY, -{days_back}, CURRENT_DATE())
-            GROUP BY PL.PRODUCTION_DATE
-            ORDER BY PL.PRODUCTION_DATE
-        )
-        SELECT
-            PRODUCTION_DATE,
-            PLANNED_RUNTIME_HOURS,
-            ACTUAL_RUNTIME_HOURS,
-            UNITS_PRODUCED,
-            UNITS_SCRAPPED,
-            CASE WHEN PLANNED_RUNTIME_HOURS > 0 
-                THEN ACTUAL_RUNTIME_HOURS / PLANNED_RUNTIME_HOURS 
-                ELSE 0 END AS AVAILABILITY,
-            0.95 AS PERFORMANCE,
-            CASE WHEN UNITS_PRODUCED > 0 
-                THEN (UNITS_PRODUCED - UNITS_SCRAPPED) / UNITS_PRODUCED 
-                ELSE 0 END AS QUALITY,
-            CASE WHEN PLANNED_RUNTIME_HOURS > 0 AND UNITS_PRODUCED > 0
-                THEN (ACTUAL_RUNTIME_HOURS / PLANNED_RUNTIME_HOURS) * 0.95 * 
-                     ((UNITS_PRODUCED - UNITS_SCRAPPED) / UNITS_PRODUCED)
-                ELSE 0 END AS OEE
-        FROM daily_production;
-    """
 
-    # 2. Plant-level daily OEE time-series (last 30 days)
-    plant_timeseries_query = f"""
-        WITH plant_daily_production AS (
-            SELECT
-                P.PLANT_NAME,
-                PL.PRODUCTION_DATE,
-                SUM(PL.PLANNED_RUNTIME_HOURS) AS PLANNED_RUNTIME_HOURS,
-                SUM(PL.ACTUAL_RUNTIME_HOURS) AS ACTUAL_RUNTIME_HOURS,
-                SUM(PL.UNITS_PRODUCED) AS UNITS_PRODUCED,
-                SUM(PL.UNITS_SCRAPPED) AS UNITS_SCRAPPED
-            FROM HYPERFORGE.SILVER.FCT_PRODUCTION_LOG PL
-            JOIN HYPERFORGE.SILVER.DIM_ASSET A ON PL.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
-            JOIN HYPERFORGE.SILVER.DIM_PROCESS PR ON PR.PROCESS_ID = A.PROCESS_ID
-            JOIN HYPERFORGE.SILVER.DIM_LINE L ON PR.LINE_ID = L.LINE_ID
-            JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
-            WHERE PL.PRODUCTION_DATE >= DATEADD(DAY, -{days_back}, CURRENT_DATE())
-            GROUP BY P.PLANT_NAME, PL.PRODUCTION_DATE
-        )
-        SELECT
-            PLANT_NAME,
-            PRODUCTION_DATE,
-            PLANNED_RUNTIME_HOURS,
-            ACTUAL_RUNTIME_HOURS,
-            UNITS_PRODUCED,
-            UNITS_SCRAPPED,
-            CASE WHEN PLANNED_RUNTIME_HOURS > 0 
-                THEN ACTUAL_RUNTIME_HOURS / PLANNED_RUNTIME_HOURS 
-                ELSE 0 END AS AVAILABILITY,
-            0.95 AS PERFORMANCE,
-            CASE WHEN UNITS_PRODUCED > 0 
-                THEN (UNITS_PRODUCED - UNITS_SCRAPPED) / UNITS_PRODUCED 
-                ELSE 0 END AS QUALITY,
-            CASE WHEN PLANNED_RUNTIME_HOURS > 0 AND UNITS_PRODUCED > 0
-                THEN (ACTUAL_RUNTIME_HOURS / PLANNED_RUNTIME_HOURS) * 0.95 * 
-                     ((UNITS_PRODUCED - UNITS_SCRAPPED) / UNITS_PRODUCED)
-                ELSE 0 END AS OEE
-        FROM plant_daily_production
-        ORDER BY PLANT_NAME, PRODUCTION_DATE;
-    """
+    # 1. Plant-level daily OEE time-series (last 30 days); the enterprise trend and the
+    #    current plant summary are both rolled up from these rows after loading
+    plant_timeseries_query = (PLANT_TIMESERIES_QUERY, [start_date])
 
-    # 3. Current plant performance summary
-    plant_current_query = """
-        WITH latest_production AS (
-            SELECT
-                P.PLANT_NAME,
-                SUM(PL.PLANNED_RUNTIME_HOURS) AS PLANNED_RUNTIME_HOURS,
-                SUM(PL.ACTUAL_RUNTIME_HOURS) AS ACTUAL_RUNTIME_HOURS,
-                SUM(PL.UNITS_PRODUCED) AS UNITS_PRODUCED,
-                SUM(PL.UNITS_SCRAPPED) AS UNITS_SCRAPPED
-            FROM HYPERFORGE.SILVER.FCT_PRODUCTION_LOG PL
-            JOIN HYPERFORGE.SILVER.DIM_ASSET A ON PL.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
-            JOIN HYPERFORGE.SILVER.DIM_PROCESS PR ON PR.PROCESS_ID = A.PROCESS_ID
-            JOIN HYPERFORGE.SILVER.DIM_LINE L ON PR.LINE_ID = L.LINE_ID
-            JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
-            WHERE PL.PRODUCTION_DATE >= DATEADD(DAY, -7, CURRENT_DATE())
-            GROUP BY P.PLANT_NAME
-        )
+    # 2. Fleet health and production at risk, aggregated to a single row in Snowflake
+    risk_kpi_query = """
         SELECT
-            PLANT_NAME,
-            PLANNED_RUNTIME_HOURS,
-            ACTUAL_RUNTIME_HOURS,
-            UNITS_PRODUCED,
-            UNITS_SCRAPPED
-        FROM latest_production
-        ORDER BY PLANT_NAME;
+            AVG(G.LATEST_HEALTH_SCORE) AS AVG_HEALTH,
+            COALESCE(SUM(G.AVG_FAILURE_PROBABILITY * A.DOWNTIME_IMPACT_PER_HOUR * 24), 0) AS PRODUCTION_AT_RISK
+        FROM HYPERFORGE.GOLD.ASSET_LATEST_HEALTH G
+        LEFT JOIN HYPERFORGE.SILVER.DIM_ASSET A ON G.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE;
     """
 
-    # 4. Asset health and risk data
-    gold_data_query = """
-        SELECT ASSET_ID, LATEST_HEALTH_SCORE, AVG_FAILURE_PROBABILITY
-        FROM HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH
-        QUALIFY ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY HOUR_TIMESTAMP DESC) = 1;
-    """
-
-    # 5. Asset health time-series (for sparkline in metric card)
-    health_timeseries_query = f"""
-        WITH daily_health AS (
-            SELECT
-                DATE_TRUNC('DAY', HOUR_TIMESTAMP) AS HEALTH_DATE,
-                AVG(LATEST_HEALTH_SCORE) AS AVG_HEALTH_SCORE
-            FROM HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH
-            WHERE HOUR_TIMESTAMP >= DATEADD(DAY, -{days_back}, CURRENT_TIMESTAMP())
-            GROUP BY DATE_TRUNC('DAY', HOUR_TIMESTAMP)
-            ORDER BY HEALTH_DATE
-        )
-        SELECT 
-            HEALTH_DATE::DATE AS HEALTH_DATE,
-            AVG_HEALTH_SCORE
-        FROM daily_health;
-    """
+    # 3. Asset health time-series (for sparkline in metric card)
+    health_timeseries_query = (HEALTH_TIMESERIES_QUERY, [start_date])
 
-    # 6. Maintenance cost data
+    # 4. Maintenance cost data
     maintenance_cost_query = """
         SELECT WT.WO_TYPE_NAME, SUM(ML.PARTS_COST + ML.LABOR_COST) AS TOTAL_COST
         FROM HYPERFORGE.SILVER.FCT_MAINTENANCE_LOG ML
@@ -192,53 +154,71 @@ def show_page():
         GROUP BY WT.WO_TYPE_NAME;
     """
 
-    # 7. Asset dimension for risk calculations
-    asset_dim_query = "SELECT ASSET_ID, DOWNTIME_IMPACT_PER_HOUR FROM HYPERFORGE.SILVER.DIM_ASSET WHERE IS_CURRENT = TRUE;"
-
     # --- DATA LOADING (PARALLEL EXECUTION) ---
     with st.spinner("Loading executive dashboard data..."):
-        # Run all 7 queries in parallel for maximum performance
+        # Run all 4 queries in parallel for maximum performance
         queries = {
-            'enterprise_ts': enterprise_timeseries_query,
             'plant_ts': plant_timeseries_query,
-            'plant_current': plant_current_query,
-            'gold_data': gold_data_query,
+            'risk_kpis': risk_kpi_query,
             'health_ts': health_timeseries_query,
-            'cost_by_type': maintenance_cost_query,
-            'asset_dim': asset_dim_query
+            'cost_by_type': maintenance_cost_query
         }
         
-        # Execute all queries in parallel (max 4 concurrent connections)
-        results = run_queries_parallel(queries, max_workers=4)
+        # One worker per query so the load takes the slowest round trip, not two waves of them
+        results = run_queries_parallel(queries, max_workers=len(queries))
         
         # Extract results
-        enterprise_ts = results['enterprise_ts']
         plant_ts = results['plant_ts']
-        plant_current = results['plant_current']
-        gold_data = results['gold_data']
+        risk_kpis = results['risk_kpis']
         health_ts = results['health_ts']
         cost_by_type = results['cost_by_type']
-        asset_dim = results['asset_dim']
+
+    # Nothing to show (e.g. a fresh deployment or a role without access): skip all the derived work
+    if plant_ts.empty and health_ts.empty and cost_by_type.empty:
+        st.warning("No data available for the executive summary.")
+        return
+
+    # Few distinct plants: factorize once so the groupbys and the chart's color split use integer codes
+    if not plant_ts.empty:
+        plant_ts['PLANT_NAME'] = plant_ts['PLANT_NAME'].astype('category')
+        plant_ts[PRODUCTION_SUM_COLUMNS] = plant_ts[PRODUCTION_SUM_COLUMNS].astype(float)
+        # Ratios only need single precision; halves the chart JSON
+        plant_ts[PLANT_RATIO_COLUMNS] = plant_ts[PLANT_RATIO_COLUMNS].astype('float32')
+        
+        # Enterprise daily series and last-7-day plant totals, rolled up from the plant rows
+        enterprise_ts = add_oee_columns(
+            plant_ts.groupby('PRODUCTION_DATE', as_index=False)[PRODUCTION_SUM_COLUMNS].sum()
+        )
+        last_week = pd.to_datetime(plant_ts['PRODUCTION_DATE']) >= pd.Timestamp(end_date - timedelta(days=7))
+        plant_current = add_oee_columns(
+            plant_ts[last_week].groupby('PLANT_NAME', observed=True, as_index=False)[PRODUCTION_SUM_COLUMNS].sum()
+        )
+    else:
+        enterprise_ts = pd.DataFrame()
+        plant_current = pd.DataFrame()
+    if not cost_by_type.empty:
+        cost_by_type['TOTAL_COST'] = cost_by_type['TOTAL_COST'].astype('float32')
 
     # --- SECTION 1: TOP-LEVEL KPI CARDS WITH SPARKLINES ---
     st.subheader("Key Performance Indicators")
     
     # Calculate current metrics (convert to float to avoid Decimal type issues)
     if len(enterprise_ts) > 0:
-        current_oee = float(enterprise_ts.iloc[-1]['OEE'])
-        prior_week_oee = float(enterprise_ts.iloc[-8:-1]['OEE'].mean()) if len(enterprise_ts) >= 8 else current_oee
+        oee = enterprise_ts['OEE'].astype(float)
+        current_oee = oee.iat[-1]
+        # Mean of the 7 days before the latest one
+        prior_week_oee = oee.rolling(7).mean().iat[-2] if len(oee) >= 8 else current_oee
         oee_delta = ((current_oee - prior_week_oee) / prior_week_oee * 100) if prior_week_oee > 0 else 0
     else:
         current_oee = 0.0
         oee_delta = 0.0
 
-    current_health = float(gold_data['LATEST_HEALTH_SCORE'].mean())
-    prior_week_health = float(health_ts.iloc[-8:-1]['AVG_HEALTH_SCORE'].mean()) if len(health_ts) >= 8 else current_health
+    # risk_kpis is a single row (or empty if the query failed); AVG_HEALTH is NULL with no health data
+    current_health = float(risk_kpis['AVG_HEALTH'].astype(float).mean())
+    prior_week_health = health_ts['AVG_HEALTH_SCORE'].astype(float).rolling(7).mean().iat[-2] if len(health_ts) >= 8 else current_health
     health_delta = current_health - prior_week_health
 
-    asset_details_for_risk = pd.merge(gold_data, asset_dim, on='ASSET_ID')
-    production_at_risk = float((asset_details_for_risk['AVG_FAILURE_PROBABILITY'] * 
-                         asset_details_for_risk['DOWNTIME_IMPACT_PER_HOUR'] * 24).sum())
+    production_at_risk = float(risk_kpis['PRODUCTION_AT_RISK'].astype(float).sum())
 
     col1, col2, col3 = st.columns(3)
     
@@ -250,13 +230,8 @@ def show_page():
         )
         # Mini sparkline for OEE
         if len(enterprise_ts) > 0:
-            fig_spark_oee = px.line(enterprise_ts, x='PRODUCTION_DATE', y='OEE')
-            fig_spark_oee.update_layout(
-                height=80, margin=dict(l=0, r=0, t=0, b=0),
-                showlegend=False, xaxis_visible=False, yaxis_visible=False
-            )
-            fig_spark_oee.update_traces(line_color='#1f77b4')
-            st.plotly_chart(fig_spark_oee, use_container_width=True)
+            spark_oee = enterprise_ts.iloc[::max(1, len(enterprise_ts) // SPARKLINE_MAX_POINTS)]
+            st.line_chart(spark_oee.set_index('PRODUCTION_DATE')['OEE'].astype(float), height=80, color='#1f77b4')
 
     with col2:
         st.metric(
@@ -266,13 +241,8 @@ def show_page():
         )
         # Mini sparkline for Health
         if len(health_ts) > 0:
-            fig_spark_health = px.line(health_ts, x='HEALTH_DATE', y='AVG_HEALTH_SCORE')
-            fig_spark_health.update_layout(
-                height=80, margin=dict(l=0, r=0, t=0, b=0),
-                showlegend=False, xaxis_visible=False, yaxis_visible=False
-            )
-            fig_spark_health.update_traces(line_color='#2ca02c')
-            st.plotly_chart(fig_spark_health, use_container_width=True)
+            spark_health = health_ts.iloc[::max(1, len(health_ts) // SPARKLINE_MAX_POINTS)]
+            st.line_chart(spark_health.set_index('HEALTH_DATE')['AVG_HEALTH_SCORE'].astype(float), height=80, color='#2ca02c')
 
     with col3:
         st.metric(
@@ -287,12 +257,16 @@ def show_page():
     st.subheader("Enterprise OEE Performance Trend (Last 30 Days)")
     
     if len(enterprise_ts) > 0:
+        # Rows are one per day, so LTTB over the row positions picks the same rows for every component
+        keep, _ = lttb_downsample(np.arange(len(enterprise_ts)), enterprise_ts['OEE'].to_numpy(dtype=float), TREND_MAX_POINTS)
+        trend_ts = enterprise_ts.iloc[keep]
+        
         fig_enterprise = go.Figure()
         
         # Add OEE line
-        fig_enterprise.add_trace(go.Scatter(
-            x=enterprise_ts['PRODUCTION_DATE'],
-            y=enterprise_ts['OEE'],
+        fig_enterprise.add_trace(go.Scattergl(
+            x=trend_ts['PRODUCTION_DATE'],
+            y=trend_ts['OEE'],
             name='OEE',
             mode='lines+markers',
             line=dict(color='#1f77b4', width=3),
@@ -300,27 +274,27 @@ def show_page():
         ))
         
         # Add Availability line
-        fig_enterprise.add_trace(go.Scatter(
-            x=enterprise_ts['PRODUCTION_DATE'],
-            y=enterprise_ts['AVAILABILITY'],
+        fig_enterprise.add_trace(go.Scattergl(
+            x=trend_ts['PRODUCTION_DATE'],
+            y=trend_ts['AVAILABILITY'],
             name='Availability',
             mode='lines',
             line=dict(color='#ff7f0e', width=2, dash='dot')
         ))
         
         # Add Performance line
-        fig_enterprise.add_trace(go.Scatter(
-            x=enterprise_ts['PRODUCTION_DATE'],
-            y=enterprise_ts['PERFORMANCE'],
+        fig_enterprise.add_trace(go.Scattergl(
+            x=trend_ts['PRODUCTION_DATE'],
+            y=trend_ts['PERFORMANCE'],
             name='Performance',
             mode='lines',
             line=dict(color='#2ca02c', width=2, dash='dot')
         ))
         
         # Add Quality line
-        fig_enterprise.add_trace(go.Scatter(
-            x=enterprise_ts['PRODUCTION_DATE'],
-            y=enterprise_ts['QUALITY'],
+        fig_enterprise.add_trace(go.Scattergl(
+            x=trend_ts['PRODUCTION_DATE'],
+            y=trend_ts['QUALITY'],
             name='Quality',
             mode='lines',
             line=dict(color='#d62728', width=2, dash='dot')
@@ -354,25 +328,20 @@ def show_page():
     st.subheader("Plant Performance Summary")
     
     if len(plant_current) > 0:
-        # Calculate OEE components for each plant
-        plant_summary = []
-        for _, row in plant_current.iterrows():
-            oee, avail, perf, qual = calculate_oee(pd.DataFrame([row]))
-            
-            # Get trend data for this plant (convert to float for comparison)
-            plant_trend = plant_ts[plant_ts['PLANT_NAME'] == row['PLANT_NAME']].tail(14)
-            trend_direction = "📈" if len(plant_trend) >= 2 and float(plant_trend.iloc[-1]['OEE']) > float(plant_trend.iloc[0]['OEE']) else "📉"
-            
-            plant_summary.append({
-                'Plant': row['PLANT_NAME'],
-                'OEE': float(oee),
-                'Availability': float(avail),
-                'Performance': float(perf),
-                'Quality': float(qual),
-                'Trend': trend_direction
-            })
+        # Trend: last vs first OEE over each plant's most recent 14 days
+        recent = plant_ts.groupby('PLANT_NAME', observed=True).tail(14)
+        trend = recent.groupby('PLANT_NAME', observed=True)['OEE'].agg(['first', 'last', 'size'])
+        rising = (trend['size'] >= 2) & (trend['last'].astype(float) > trend['first'].astype(float))
+        trend_direction = rising.reindex(plant_current['PLANT_NAME'], fill_value=False).map({True: "📈", False: "📉"})
         
-        plant_df = pd.DataFrame(plant_summary)
+        plant_df = pd.DataFrame({
+            'Plant': plant_current['PLANT_NAME'].to_numpy(),
+            'OEE': plant_current['OEE'].to_numpy(),
+            'Availability': plant_current['AVAILABILITY'].to_numpy(),
+            'Performance': plant_current['PERFORMANCE'].to_numpy(),
+            'Quality': plant_current['QUALITY'].to_numpy(),
+            'Trend': trend_direction.to_numpy()
+        })
         
         # Display as formatted table
         st.dataframe(
@@ -390,12 +359,13 @@ def show_page():
         st.subheader("Plant OEE Trends Comparison")
         if len(plant_ts) > 0:
             fig_plants = px.line(
-                plant_ts,
+                plant_ts[['PRODUCTION_DATE', 'OEE', 'PLANT_NAME']],
                 x='PRODUCTION_DATE',
                 y='OEE',
                 color='PLANT_NAME',
                 title='OEE by Plant Over Time',
-                markers=True
+                markers=True,
+                render_mode='webgl'
             )
             fig_plants.update_layout(
                 xaxis_title="Date",
@@ -429,14 +399,18 @@ def show_page():
     with col5:
         st.markdown("### Maintenance Cost Distribution")
         if len(cost_by_type) > 0:
+            # Hover text formatted once here rather than by Plotly.js on every hover
+            cost_by_type['COST_FMT'] = cost_by_type['TOTAL_COST'].map('${:,.0f}'.format)
             fig_pie = px.pie(
                 cost_by_type,
                 names='WO_TYPE_NAME',
                 values='TOTAL_COST',
                 title="Cost by Maintenance Type",
-                hole=0.4
+                hole=0.4,
+                custom_data=['COST_FMT']
             )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+            fig_pie.update_traces(textposition='inside', textinfo='percent+label',
+                                  hovertemplate='%{label}<br>%{customdata[0]}<extra></extra>')
             st.plotly_chart(fig_pie, use_container_width=True)
         else:
             st.warning("No maintenance cost data available.")
\ No newline at end of file
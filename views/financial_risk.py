@@ -8,20 +8,21 @@
 #     greatest financial threat to the operation.
 #
 # DATA SOURCES:
-#   - Primary: `HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH`
-#     - This table provides the core risk factors (failure probability, RUL) in a pre-aggregated
-#       format for maximum performance.
+#   - Primary: `HYPERFORGE.GOLD.ASSET_LATEST_HEALTH`
+#     - Latest row per asset of `AGG_ASSET_HOURLY_HEALTH`; provides the core risk factors
+#       (failure probability, RUL) without a per-request window scan.
 #   - Secondary: `HYPERFORGE.SILVER` Layer
 #     - `DIM_ASSET`: Joined to get asset names and the crucial `DOWNTIME_IMPACT_PER_HOUR` value.
 #     - `DIM_ASSET_CLASS`: Joined to get the descriptive name for each asset category.
 #
 # FUNCTIONALITY & DRILL PATH:
 #   1. Risk Contribution by Asset Class (Level 1):
-#      - The view calculates the "Production at Risk" for every asset.
-#      - It then aggregates this risk by asset class and displays it in a treemap, making it
+#      - Snowflake sums the "Production at Risk" of every asset by asset class.
+#      - The view displays these totals in a treemap, making it
 #        easy to see which categories (e.g., "CNC Machines") contribute the most risk.
 #   2. Critical Asset Matrix (Level 2):
-#      - A dropdown allows the user to filter the view to a single asset class.
+#      - A dropdown allows the user to filter the view to a single asset class; only that class's
+#        assets are queried.
 #      - The view then renders a bubble chart (risk matrix) for all assets in that class.
 #      - This matrix plots Failure Probability vs. Financial Impact, with bubble size indicating
 #        urgency (e.g., tied to risk amount). Assets in the top-right quadrant are the most critical.
@@ -43,53 +44,80 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from utils.data_loader import run_query
 
+# Per-asset risk for one asset class: latest GOLD health rows joined with SILVER dimensions for context
+CLASS_RISK_QUERY = """
+    SELECT
+        G.ASSET_ID,
+        A.ASSET_NAME,
+        AC.CLASS_NAME,
+        A.DOWNTIME_IMPACT_PER_HOUR,
+        G.AVG_FAILURE_PROBABILITY,
+        G.LATEST_HEALTH_SCORE,
+        G.MIN_RUL_DAYS,
+        G.AVG_FAILURE_PROBABILITY * A.DOWNTIME_IMPACT_PER_HOUR * 24 AS PRODUCTION_AT_RISK
+    FROM HYPERFORGE.GOLD.ASSET_LATEST_HEALTH G
+    JOIN HYPERFORGE.SILVER.DIM_ASSET A ON G.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
+    JOIN HYPERFORGE.SILVER.DIM_ASSET_CLASS AC ON A.ASSET_CLASS_ID = AC.ASSET_CLASS_ID
+    WHERE AC.CLASS_NAME = %s
+    ORDER BY PRODUCTION_AT_RISK DESC NULLS LAST;
+"""
+
 def show_page():
     """Renders the Financial Risk Drill-Down page."""
+    # Plotly is only needed once the page renders; import here rather than when app.py loads the views
+    import plotly.express as px
     st.header("💰 Financial Risk Drill-Down")
 
     # --- On-Demand Data Loading ---
-    # This query joins the GOLD layer health data with SILVER dimensions for context.
-    query = """
+    # Risk totals per class for the treemap, aggregated in Snowflake (one row per class)
+    risk_by_class_query = """
         SELECT
-            G.ASSET_ID,
-            A.ASSET_NAME,
             AC.CLASS_NAME,
-            A.DOWNTIME_IMPACT_PER_HOUR,
-            G.AVG_FAILURE_PROBABILITY,
-            G.LATEST_HEALTH_SCORE,
-            G.MIN_RUL_DAYS
-        FROM HYPERFORGE.GOLD.AGG_ASSET_HOURLY_HEALTH G
+            SUM(G.AVG_FAILURE_PROBABILITY * A.DOWNTIME_IMPACT_PER_HOUR * 24) AS PRODUCTION_AT_RISK
+        FROM HYPERFORGE.GOLD.ASSET_LATEST_HEALTH G
         JOIN HYPERFORGE.SILVER.DIM_ASSET A ON G.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
         JOIN HYPERFORGE.SILVER.DIM_ASSET_CLASS AC ON A.ASSET_CLASS_ID = AC.ASSET_CLASS_ID
-        QUALIFY ROW_NUMBER() OVER (PARTITION BY G.ASSET_ID ORDER BY G.HOUR_TIMESTAMP DESC) = 1;
+        GROUP BY AC.CLASS_NAME;
     """
-    df_risk = run_query(query)
-    df_risk['PRODUCTION_AT_RISK'] = df_risk['AVG_FAILURE_PROBABILITY'] * df_risk['DOWNTIME_IMPACT_PER_HOUR'] * 24
+    risk_by_class = run_query(risk_by_class_query)
+    if risk_by_class.empty:
+        st.warning("No asset risk data available.")
+        return
+    risk_by_class['PRODUCTION_AT_RISK'] = risk_by_class['PRODUCTION_AT_RISK'].astype('float32')
 
     # --- UI Rendering ---
     st.subheader("1. Risk Contribution by Asset Class")
-    risk_by_class = df_risk.groupby('CLASS_NAME')['PRODUCTION_AT_RISK'].sum().reset_index()
-    fig_treemap = px.treemap(risk_by_class, path=['CLASS_NAME'], values='PRODUCTION_AT_RISK', title='Total Production at Risk by Asset Class', color='PRODUCTION_AT_RISK', color_continuous_scale='Reds')
+    # Hover text formatted once here rather than by Plotly.js on every hover
+    risk_by_class['RISK_FMT'] = risk_by_class['PRODUCTION_AT_RISK'].map('${:,.0f}'.format)
+    fig_treemap = px.treemap(risk_by_class, path=['CLASS_NAME'], values='PRODUCTION_AT_RISK', title='Total Production at Risk by Asset Class', color='PRODUCTION_AT_RISK', color_continuous_scale='Reds', custom_data=['RISK_FMT'])
+    fig_treemap.update_traces(hovertemplate='%{label}<br>%{customdata[0]}<extra></extra>')
     st.plotly_chart(fig_treemap, use_container_width=True)
 
+    display_risk_matrix(risk_by_class['CLASS_NAME'])
+
+@st.fragment
+def display_risk_matrix(class_names):
+    """Risk matrix and action plan for one asset class (fragment - class changes rerun only this)."""
+    import plotly.express as px
     st.subheader("2. Critical Asset Risk Matrix")
-    selected_class = st.selectbox("Select Asset Class to Analyze:", options=df_risk['CLASS_NAME'].unique())
+    selected_class = st.selectbox("Select Asset Class to Analyze:", options=class_names)
     
     if selected_class:
-        class_df = df_risk[df_risk['CLASS_NAME'] == selected_class]
+        # Only the selected class's assets are fetched; run_query caches per class
+        class_df = run_query(CLASS_RISK_QUERY, [selected_class])
         fig_bubble = px.scatter(
-            class_df, x="AVG_FAILURE_PROBABILITY", y="DOWNTIME_IMPACT_PER_HOUR", size="PRODUCTION_AT_RISK",
+            class_df[['ASSET_NAME', 'AVG_FAILURE_PROBABILITY', 'DOWNTIME_IMPACT_PER_HOUR', 'PRODUCTION_AT_RISK', 'LATEST_HEALTH_SCORE']],
+            x="AVG_FAILURE_PROBABILITY", y="DOWNTIME_IMPACT_PER_HOUR", size="PRODUCTION_AT_RISK",
             color="LATEST_HEALTH_SCORE", color_continuous_scale="RdYlGn_r", hover_name="ASSET_NAME",
-            title=f"Risk Matrix for {selected_class}", size_max=60
+            title=f"Risk Matrix for {selected_class}", size_max=60, render_mode='webgl'
         )
         st.plotly_chart(fig_bubble, use_container_width=True)
         
         st.subheader("3. Asset Action Plan")
         if not class_df.empty:
-            high_risk_asset = class_df.sort_values("PRODUCTION_AT_RISK", ascending=False).iloc[0]
+            high_risk_asset = class_df.iloc[0]  # query is ordered by PRODUCTION_AT_RISK DESC
             st.error(f"**Highest Risk Asset Identified:** {high_risk_asset['ASSET_NAME']}")
             col1, col2 = st.columns(2)
             with col1:
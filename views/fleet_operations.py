@@ -3,13 +3,38 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from utils.data_loader import get_mock_data
+from utils.calculations import lttb_downsample
 from utils.cortex_analyst import render_chat_panel
 
 st.set_page_config(page_title="Fleet Operations Center", layout="wide")
 
+SENSOR_CHART_POINTS = 2000  # Max points per sensor trace sent to Plotly
+
+TRIAGE_COLUMNS = ['asset_id', 'location', 'health_score', 'predicted_failure_mode', 'rul_days']
+TRIAGE_COLUMN_CONFIG = {
+    "health_score": st.column_config.ProgressColumn(
+        "Health Score",
+        help="The AI-powered health score of the asset. Lower is worse.",
+        min_value=0,
+        max_value=100,
+        format="%d"
+    ),
+    "rul_days": st.column_config.NumberColumn(
+        "RUL (Days)",
+        help="Remaining Useful Life in days until predicted failure."
+    )
+}
+
 # --- Data Loading ---
+@st.cache_data
+def get_triage_df(assets, health):
+    """Joins assets to their health on asset_id, sorted by health score and indexed by asset."""
+    merged = assets.set_index('asset_id').join(health.set_index('asset_id'), how='inner')
+    # Sorted by health so the threshold filter is a prefix slice, indexed by asset for lookups
+    return merged.sort_values('health_score').reset_index().set_index('asset_id', drop=False)
+
 data = get_mock_data()
-df = pd.merge(data['assets'], data['health'], on='asset_id')
+df = get_triage_df(data['assets'], data['health'])
 tech_df = data['technicians']
 
 # --- Page Title ---
@@ -28,23 +53,10 @@ with main_col:
     selected_type = f1.multiselect("Filter by Asset Type:", options=df['asset_type'].unique(), default=df['asset_type'].unique())
     health_threshold = f2.slider("Show assets with health score below:", 0, 100, 80)
     
-    triage_df = df[(df['asset_type'].isin(selected_type)) & (df['health_score'] <= health_threshold)]
-    triage_df = triage_df.sort_values('health_score').reset_index(drop=True)
+    triage_df = df.iloc[:df['health_score'].searchsorted(health_threshold, side='right')]
+    triage_df = triage_df[triage_df['asset_type'].isin(set(selected_type))]
     
-    st.dataframe(triage_df[['asset_id', 'location', 'health_score', 'predicted_failure_mode', 'rul_days']],
-                 column_config={
-                     "health_score": st.column_config.ProgressColumn(
-                         "Health Score",
-                         help="The AI-powered health score of the asset. Lower is worse.",
-                         min_value=0,
-                         max_value=100,
-                         format="%d"
-                     ),
-                     "rul_days": st.column_config.NumberColumn(
-                         "RUL (Days)",
-                         help="Remaining Useful Life in days until predicted failure."
-                     )
-                 }, use_container_width=True)
+    st.dataframe(triage_df.loc[:, TRIAGE_COLUMNS], column_config=TRIAGE_COLUMN_CONFIG, use_container_width=True, hide_index=True)
 
     # --- Click-to-Detail Simulation ---
     st.markdown("#### Asset Deep Dive")
@@ -52,7 +64,7 @@ with main_col:
     
     if selected_asset_id:
         with st.expander(f"Details for {selected_asset_id}", expanded=True):
-            asset_details = df[df['asset_id'] == selected_asset_id].iloc[0]
+            asset_details = df.loc[selected_asset_id]
             
             st.write(f"**Location:** {asset_details['location']} | **Type:** {asset_details['asset_type']} | **Model:** {asset_details['model']}")
             
@@ -61,7 +73,14 @@ with main_col:
                 st.write("**Recent Sensor Readings**")
                 sensor_data = data['sensors'][data['sensors']['asset_id'] == selected_asset_id]
                 if not sensor_data.empty:
-                    fig = px.line(sensor_data, x='timestamp', y=['temperature', 'vibration'], title="Vibration & Temperature Trend")
+                    # Downsample each trace so long histories stay light in the browser
+                    sensor_data = sensor_data.sort_values('timestamp')
+                    traces = []
+                    for metric in ['temperature', 'vibration']:
+                        x, y = lttb_downsample(sensor_data['timestamp'].to_numpy(), sensor_data[metric].to_numpy(), SENSOR_CHART_POINTS)
+                        traces.append(pd.DataFrame({'timestamp': x, 'value': y, 'variable': metric}))
+                    fig = px.line(pd.concat(traces, ignore_index=True), x='timestamp', y='value', color='variable',
+                                  title="Vibration & Temperature Trend", render_mode='webgl')
                     st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.warning("No detailed sensor data available for this asset.")
@@ -93,8 +112,11 @@ with main_col:
     with c2:
         st.subheader("Alerts Feed")
         alerts = triage_df[triage_df['health_score'] < 50].head(5)
-        for _, row in alerts.iterrows():
-            st.error(f"**CRITICAL ALERT:** {row['predicted_failure_mode']} predicted on **{row['asset_id']}** in {row['location']}.")
+        if not alerts.empty:
+            st.error("\n\n".join(
+                f"**CRITICAL ALERT:** {row.predicted_failure_mode} predicted on **{row.asset_id}** in {row.location}."
+                for row in alerts.itertuples(index=False)
+            ))
 
 
 with chat_col:
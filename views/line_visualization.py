@@ -3,8 +3,16 @@ import streamlit.components.v1 as components
 import os
 import json
 import pandas as pd
-import hashlib
-from utils.data_loader import run_query, run_queries_parallel
+import numpy as np
+import time
+import zlib
+from utils.data_loader import run_query
+
+@st.cache_resource
+def load_viz_template(html_file_path):
+    """Read the visualization HTML template once per process."""
+    with open(html_file_path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 @st.fragment
 def render_visualization(selected_plant, selected_line, factory_data):
@@ -15,27 +23,23 @@ def render_visualization(selected_plant, selected_line, factory_data):
     
     # Read and display the HTML content
     try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        html_content = load_viz_template(html_file_path)
         
-        # Replace the mock data with live data
-        import re
-        import time
-        pattern = r'__REPLACE_WITH_LIVE_DATA__'
-        replacement = json.dumps(factory_data, indent=2, ensure_ascii=False)
-        html_content = re.sub(pattern, replacement, html_content, flags=re.DOTALL)
+        # Serialize once (compact) and reuse it for both the splice and the hash
+        payload = json.dumps(factory_data, ensure_ascii=False, separators=(',', ':'))
+        html_content = html_content.replace('__REPLACE_WITH_LIVE_DATA__', payload)
         
-        # Create a unique hash based on the data to force complete refresh
-        data_hash = hashlib.md5(json.dumps(factory_data).encode()).hexdigest()
-        viz_id = f"{selected_plant}_{selected_line}_{data_hash}_{time.time()}"
+        # Identify the visualization by its data only, so the iframe HTML stays identical
+        # (and is not remounted) across reruns until the plant, line or data changes
+        data_hash = f"{zlib.crc32(payload.encode()):08x}"
+        viz_id = f"{selected_plant}_{selected_line}_{data_hash}"
         
-        # Add multiple unique identifiers to force refresh
+        # Add unique identifiers for this plant, line and data
         unique_comments = f"""
         <!-- Visualization ID: {viz_id} -->
         <!-- Plant: {selected_plant} -->
         <!-- Line: {selected_line} -->
         <!-- Data Hash: {data_hash} -->
-        <!-- Timestamp: {time.time()} -->
         <script>
         // Force unique instance
         window.VIZ_ID = '{viz_id}';
@@ -82,8 +86,13 @@ def show_page():
     with col1:
         st.subheader("Configuration")
         
-        # Get live data from Snowflake
-        plants_data = get_plants_data()
+        # Get live data from Snowflake (errors are reported here, outside the cache, so a
+        # failed lookup is retried on the next run instead of being cached)
+        try:
+            plants_data = get_plants_data()
+        except Exception as e:
+            st.error(f"Error loading plants: {str(e)}")
+            plants_data = pd.DataFrame()
         if plants_data.empty:
             st.warning("No plants found in the database.")
             return
@@ -95,7 +104,11 @@ def show_page():
         )
         
         # Get lines for selected plant
-        lines_data = get_lines_data(selected_plant)
+        try:
+            lines_data = get_lines_data(selected_plant)
+        except Exception as e:
+            st.error(f"Error loading lines: {str(e)}")
+            lines_data = pd.DataFrame()
         if lines_data.empty:
             st.warning(f"No lines found for {selected_plant}.")
             return
@@ -127,36 +140,37 @@ def show_page():
         show_health_scores = st.checkbox("Show Health Scores", value=True)
         auto_refresh = st.checkbox("Auto Refresh", value=False)
         
+        refresh_interval = None
         if auto_refresh:
             refresh_interval = st.slider("Refresh Interval (seconds)", 5, 60, 30)
             st.info(f"Auto-refreshing every {refresh_interval} seconds")
-            
-            # Initialize session state for auto-refresh
-            import time
-            if 'last_refresh' not in st.session_state:
-                st.session_state.last_refresh = time.time()
-            
-            # Check if it's time to refresh
-            elapsed = time.time() - st.session_state.last_refresh
-            if elapsed >= refresh_interval:
-                st.session_state.last_refresh = time.time()
-                st.rerun(scope="app")
-            else:
-                # Show countdown
-                remaining = int(refresh_interval - elapsed)
-                st.text(f"Next refresh in {remaining} seconds...")
-                time.sleep(1)
-                st.rerun(scope="app")
     
     with col2:
         st.subheader("3D Factory Floor Visualization")
         
-        # Get factory data for the selected plant and line
-        factory_data = get_factory_data(selected_plant, selected_line)
+        # Auto refresh reruns only this fragment on Streamlit's own timer, rather than
+        # sleeping in the script and rerunning the whole app
+        @st.fragment(run_every=refresh_interval)
+        def live_visualization():
+            # With auto refresh on, a new tick each interval misses the 30s data cache so
+            # every timer rerun loads fresh telemetry
+            refresh_tick = int(time.time() // refresh_interval) if refresh_interval else None
+            
+            # Get factory data for the selected plant and line
+            try:
+                factory_data = get_factory_data(selected_plant, selected_line, refresh_tick)
+            except Exception as e:
+                st.error(f"❌ Error loading factory data: {str(e)}")
+                import traceback
+                st.code(traceback.format_exc())
+                factory_data = {"id": "error", "name": "Error", "type": "plant", "children": []}
+            
+            # Render the visualization using the fragment
+            # This allows the visualization to be rerun independently
+            render_visualization(selected_plant, selected_line, factory_data)
+            return factory_data
         
-        # Render the visualization using the fragment
-        # This allows the visualization to be rerun independently
-        render_visualization(selected_plant, selected_line, factory_data)
+        factory_data = live_visualization()
     
     # Additional information section
     st.markdown("---")
@@ -182,311 +196,219 @@ def show_page():
                 assets = process.get('children', [])
                 st.write(f"- {process.get('name', 'Unknown')}: {len(assets)} assets")
 
+@st.cache_data(ttl=3600, show_spinner=False)
 def get_plants_data():
-    """Get list of plants from Snowflake."""
-    try:
-        query = """
-            SELECT DISTINCT PLANT_NAME
-            FROM HYPERFORGE.SILVER.DIM_PLANT
-            ORDER BY PLANT_NAME
-        """
-        return run_query(query)
-    except Exception as e:
-        st.error(f"Error loading plants: {str(e)}")
-        return pd.DataFrame()
+    """Get list of plants from Snowflake (raises on query errors so they are not cached)."""
+    query = """
+        SELECT DISTINCT PLANT_NAME
+        FROM HYPERFORGE.SILVER.DIM_PLANT
+        ORDER BY PLANT_NAME
+    """
+    return run_query(query)
 
+@st.cache_data(ttl=600, show_spinner=False)
 def get_lines_data(plant_name):
-    """Get lines for a specific plant."""
-    try:
-        query = """
-            SELECT DISTINCT L.LINE_NAME
-            FROM HYPERFORGE.SILVER.DIM_LINE L
-            JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
-            WHERE P.PLANT_NAME = %s
-            ORDER BY L.LINE_NAME
-        """
-        return run_query(query, params=[plant_name])
-    except Exception as e:
-        st.error(f"Error loading lines: {str(e)}")
-        return pd.DataFrame()
+    """Get lines for a specific plant (raises on query errors so they are not cached)."""
+    query = """
+        SELECT DISTINCT L.LINE_NAME
+        FROM HYPERFORGE.SILVER.DIM_LINE L
+        JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
+        WHERE P.PLANT_NAME = %s
+        ORDER BY L.LINE_NAME
+    """
+    return run_query(query, params=[plant_name])
 
-def get_factory_data(plant_name, line_name):
-    """Get complete factory data structure for visualization."""
-    import time
+@st.cache_data(ttl=30, show_spinner=False)
+def get_factory_data(plant_name, line_name, refresh_tick=None):
+    """
+    Get complete factory data structure for visualization (raises on query errors so they are not cached).
+    refresh_tick only varies the cache key, so auto refresh can fetch more often than the TTL.
+    """
     start_time = time.time()
     
-    try:
-        # Debug output
-        st.info(f"🔍 Loading data for: {plant_name} → {line_name}")
-        
-        # Get plant info
-        plant_query = """
-            SELECT PLANT_ID, PLANT_NAME
-            FROM HYPERFORGE.SILVER.DIM_PLANT
-            WHERE PLANT_NAME = %s
-        """
-        plant_data = run_query(plant_query, params=[plant_name])
-        
-        if plant_data.empty:
-            return {"id": "no_data", "name": "No Data", "type": "plant", "children": []}
-        
-        # Convert to native Python int to avoid numpy type issues
-        plant_id = int(plant_data.iloc[0]['PLANT_ID'])
-        
-        # Get line info
-        line_query = """
-            SELECT L.LINE_ID, L.LINE_NAME
-            FROM HYPERFORGE.SILVER.DIM_LINE L
-            JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
-            WHERE P.PLANT_NAME = %s AND L.LINE_NAME = %s
-        """
-        line_data = run_query(line_query, params=[plant_name, line_name])
-        
-        if line_data.empty:
-            return {"id": "no_data", "name": "No Data", "type": "plant", "children": []}
-        
-        # Convert to native Python int to avoid numpy type issues
-        line_id = int(line_data.iloc[0]['LINE_ID'])
-        
-        # Get processes and assets from the database
-        # Query assets for this specific line
-        assets_query = """
-            SELECT DISTINCT
-                P.PROCESS_ID,
-                P.PROCESS_NAME,
-                A.ASSET_ID,
-                A.ASSET_NAME
+    # Debug output
+    st.info(f"🔍 Loading data for: {plant_name} → {line_name}")
+    
+    # Get plant and line ids in one round trip
+    line_query = """
+        SELECT P.PLANT_ID, L.LINE_ID
+        FROM HYPERFORGE.SILVER.DIM_LINE L
+        JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID
+        WHERE P.PLANT_NAME = %s AND L.LINE_NAME = %s
+    """
+    line_data = run_query(line_query, params=[plant_name, line_name])
+    
+    if line_data.empty:
+        return {"id": "no_data", "name": "No Data", "type": "plant", "children": []}
+    
+    # Convert to native Python int to avoid numpy type issues
+    plant_id = int(line_data.iloc[0]['PLANT_ID'])
+    line_id = int(line_data.iloc[0]['LINE_ID'])
+    
+    # Processes and assets for this line, each joined to its latest telemetry (sensor
+    # readings and health), in one query. QUALIFY keeps only the newest reading per asset,
+    # so every row already carries everything the asset node below needs.
+    assets_query = """
+        WITH LINE_ASSETS AS (
+            SELECT P.PROCESS_ID, P.PROCESS_NAME, A.ASSET_ID, A.ASSET_NAME, A.DOWNTIME_IMPACT_PER_HOUR
             FROM HYPERFORGE.SILVER.DIM_ASSET A
             JOIN HYPERFORGE.SILVER.DIM_PROCESS P ON A.PROCESS_ID = P.PROCESS_ID
             WHERE P.LINE_ID = %s
-            ORDER BY P.PROCESS_ID, A.ASSET_ID
-        """
-        assets_data = run_query(assets_query, params=[line_id])
-        
-        # Debug: Check if we have assets data
-        if assets_data.empty:
-            st.warning(f"No assets found for line_id: {line_id}")
-            return {"id": "no_assets", "name": f"{plant_name} - {line_name}", "type": "plant", "children": [
-                {"id": f"line_{line_id}", "name": line_name, "type": "line", "children": []}
-            ]}
+        )
+        SELECT
+            LA.PROCESS_ID,
+            LA.PROCESS_NAME,
+            LA.ASSET_ID,
+            LA.ASSET_NAME,
+            LA.DOWNTIME_IMPACT_PER_HOUR,
+            T.TEMPERATURE_C,
+            T.VIBRATION_MM_S,
+            T.PRESSURE_PSI,
+            T.HEALTH_SCORE,
+            T.FAILURE_PROBABILITY,
+            T.RUL_DAYS,
+            T.IS_ANOMALOUS
+        FROM LINE_ASSETS LA
+        LEFT JOIN (
+            SELECT ASSET_ID, TEMPERATURE_C, VIBRATION_MM_S, PRESSURE_PSI,
+                   HEALTH_SCORE, FAILURE_PROBABILITY, RUL_DAYS, IS_ANOMALOUS
+            FROM HYPERFORGE.SILVER.FCT_ASSET_TELEMETRY
+            WHERE ASSET_ID IN (SELECT ASSET_ID FROM LINE_ASSETS)
+              -- Only the last week of readings (relative to the newest one) feeds the window
+              AND RECORDED_AT >= (SELECT DATEADD(day, -7, MAX(RECORDED_AT)) FROM HYPERFORGE.SILVER.FCT_ASSET_TELEMETRY)
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY RECORDED_AT DESC) = 1
+        ) T ON LA.ASSET_ID = T.ASSET_ID
+        ORDER BY LA.PROCESS_ID, LA.ASSET_ID
+    """
+    assets_data = run_query(assets_query, params=[line_id])
+    
+    # Debug: Check if we have assets data
+    if assets_data.empty:
+        st.warning(f"No assets found for line_id: {line_id}")
+        return {"id": "no_assets", "name": f"{plant_name} - {line_name}", "type": "plant", "children": [
+            {"id": f"line_{line_id}", "name": line_name, "type": "line", "children": []}
+        ]}
+    
+    # Cast the id columns once; itertuples below then yields plain Python ints
+    assets_data[['PROCESS_ID', 'ASSET_ID']] = assets_data[['PROCESS_ID', 'ASSET_ID']].astype(np.int64)
+    
+    # Classify and round every sensor reading up front rather than per asset in the loop
+    sensor_cols = ['TEMPERATURE_C', 'VIBRATION_MM_S', 'PRESSURE_PSI']
+    assets_data[sensor_cols] = assets_data[sensor_cols].astype(float)
+    status_labels = ['normal', 'warning', 'critical']
+    assets_data['TEMP_STATUS'] = pd.cut(assets_data['TEMPERATURE_C'], bins=[-np.inf, 100, 150, np.inf], labels=status_labels)
+    assets_data['VIB_STATUS'] = pd.cut(assets_data['VIBRATION_MM_S'], bins=[-np.inf, 1.5, 2.0, np.inf], labels=status_labels)
+    assets_data['PRES_STATUS'] = np.where(
+        (assets_data['PRESSURE_PSI'] > 160) | (assets_data['PRESSURE_PSI'] < 120), 'warning', 'normal'
+    )
+    assets_data[sensor_cols] = assets_data[sensor_cols].round(2)
+    
+    # Build the factory data structure with the correct hierarchy: plant -> line -> processes
+    factory_data = {
+        "id": f"plant_{plant_id}",
+        "name": plant_name,
+        "type": "plant",
+        "children": []
+    }
+    
+    # Create the line level (required by HTML structure)
+    line_data = {
+        "id": f"line_{line_id}",
+        "name": line_name,
+        "type": "line",
+        "children": []
+    }
+    
+    # Group assets by process
+    processes = {}
+    for asset in assets_data.itertuples(index=False):
+        process_id = asset.PROCESS_ID
+        asset_id = asset.ASSET_ID
+        
+        if process_id not in processes:
+            processes[process_id] = {
+                "id": f"proc_{process_id}",
+                "name": asset.PROCESS_NAME,
+                "type": "process",
+                "children": []
+            }
         
-        # Get latest sensor readings for these assets from telemetry
-        # Convert to native Python types to avoid numpy type issues
-        asset_ids = [int(x) for x in assets_data['ASSET_ID'].tolist()]
-        if asset_ids:
-            # Get the latest telemetry reading for each asset
-            # Transform columnar sensor data into rows
-            sensors_query = """
-                WITH latest_telemetry AS (
-                    SELECT 
-                        ASSET_ID,
-                        TEMPERATURE_C,
-                        VIBRATION_MM_S,
-                        PRESSURE_PSI,
-                        RECORDED_AT,
-                        ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY RECORDED_AT DESC) as rn
-                    FROM HYPERFORGE.SILVER.FCT_ASSET_TELEMETRY
-                    WHERE ASSET_ID IN ({})
-                )
-                SELECT 
-                    ASSET_ID,
-                    TEMPERATURE_C,
-                    VIBRATION_MM_S,
-                    PRESSURE_PSI
-                FROM latest_telemetry
-                WHERE rn = 1
-            """.format(','.join(['%s'] * len(asset_ids)))
-            
-            telemetry_data = run_query(sensors_query, params=asset_ids)
+        # Transform this asset's latest telemetry to sensor format
+        sensor_children = []
+        
+        # Temperature sensor
+        if pd.notna(asset.TEMPERATURE_C):
+            sensor_children.append({
+                "id": f"sensor_{asset_id}_temp",
+                "type": "Temperature",
+                "value": asset.TEMPERATURE_C,
+                "unit": "°C",
+                "status": asset.TEMP_STATUS
+            })
+        
+        # Vibration sensor
+        if pd.notna(asset.VIBRATION_MM_S):
+            sensor_children.append({
+                "id": f"sensor_{asset_id}_vib",
+                "type": "Vibration",
+                "value": asset.VIBRATION_MM_S,
+                "unit": "mm/s",
+                "status": asset.VIB_STATUS
+            })
+        
+        # Pressure sensor (if available)
+        if pd.notna(asset.PRESSURE_PSI):
+            sensor_children.append({
+                "id": f"sensor_{asset_id}_pres",
+                "type": "Pressure",
+                "value": asset.PRESSURE_PSI,
+                "unit": "PSI",
+                "status": asset.PRES_STATUS
+            })
+        
+        # Health data for this asset; None when it has no telemetry in the last week, so a
+        # silent (possibly dead) asset is never drawn as healthy
+        health_score = float(asset.HEALTH_SCORE) / 100.0 if pd.notna(asset.HEALTH_SCORE) else None  # Convert 0-100 to 0-1
+        failure_prob = float(asset.FAILURE_PROBABILITY) if pd.notna(asset.FAILURE_PROBABILITY) else None
+        is_anomalous = bool(asset.IS_ANOMALOUS) if pd.notna(asset.IS_ANOMALOUS) else False
+        
+        # Determine status based on health score and anomalies
+        if health_score is None:
+            status = "No Telemetry"
+        elif is_anomalous or health_score < 0.5:
+            status = "Critical"
+        elif health_score < 0.7:
+            status = "Warning"
         else:
-            telemetry_data = pd.DataFrame()
-        
-        # Build the factory data structure with the correct hierarchy: plant -> line -> processes
-        factory_data = {
-            "id": f"plant_{plant_id}",
-            "name": plant_name,
-            "type": "plant",
-            "children": []
-        }
-        
-        # Create the line level (required by HTML structure)
-        line_data = {
-            "id": f"line_{line_id}",
-            "name": line_name,
-            "type": "line",
-            "children": []
+            status = "Online"
+        
+        downtime_cost = float(asset.DOWNTIME_IMPACT_PER_HOUR) if pd.notna(asset.DOWNTIME_IMPACT_PER_HOUR) else 5000
+        
+        # Create asset object with real data
+        asset_obj = {
+            "id": f"asset_{asset_id}",
+            "name": asset.ASSET_NAME,
+            "type": "asset",
+            "healthScore": health_score,
+            "status": status,
+            "pof": f"{failure_prob * 100:.1f}%" if failure_prob is not None else "N/A",
+            "cost": f"${downtime_cost:,.0f}/hr",
+            "children": sensor_children
         }
         
-        # Get health scores and predictions for assets from latest telemetry
-        # Note: asset_ids already converted to native Python ints above
-        if asset_ids:
-            health_query = """
-                WITH latest_health AS (
-                    SELECT 
-                        ASSET_ID,
-                        HEALTH_SCORE,
-                        FAILURE_PROBABILITY,
-                        RUL_DAYS,
-                        IS_ANOMALOUS,
-                        ROW_NUMBER() OVER (PARTITION BY ASSET_ID ORDER BY RECORDED_AT DESC) as rn
-                    FROM HYPERFORGE.SILVER.FCT_ASSET_TELEMETRY
-                    WHERE ASSET_ID IN ({})
-                )
-                SELECT 
-                    ASSET_ID,
-                    HEALTH_SCORE,
-                    FAILURE_PROBABILITY,
-                    RUL_DAYS,
-                    IS_ANOMALOUS
-                FROM latest_health
-                WHERE rn = 1
-            """.format(','.join(['%s'] * len(asset_ids)))
-            health_data = run_query(health_query, params=asset_ids)
-            
-            # Get downtime impact from DIM_ASSET
-            asset_info_query = """
-                SELECT 
-                    ASSET_ID,
-                    DOWNTIME_IMPACT_PER_HOUR
-                FROM HYPERFORGE.SILVER.DIM_ASSET
-                WHERE ASSET_ID IN ({})
-            """.format(','.join(['%s'] * len(asset_ids)))
-            asset_info_data = run_query(asset_info_query, params=asset_ids)
-        else:
-            health_data = pd.DataFrame()
-            asset_info_data = pd.DataFrame()
-        
-        # Group assets by process
-        processes = {}
-        for _, asset in assets_data.iterrows():
-            # Convert to native Python types
-            process_id = int(asset['PROCESS_ID'])
-            asset_id = int(asset['ASSET_ID'])
-            
-            if process_id not in processes:
-                processes[process_id] = {
-                    "id": f"proc_{process_id}",
-                    "name": asset['PROCESS_NAME'],
-                    "type": "process",
-                    "children": []
-                }
-            
-            # Get telemetry for this asset and transform to sensor format
-            asset_telemetry = telemetry_data[telemetry_data['ASSET_ID'].astype(int) == asset_id] if not telemetry_data.empty else pd.DataFrame()
-            sensor_children = []
-            
-            if not asset_telemetry.empty:
-                telemetry_row = asset_telemetry.iloc[0]
-                
-                # Temperature sensor
-                if telemetry_row['TEMPERATURE_C'] is not None:
-                    temp_value = float(telemetry_row['TEMPERATURE_C'])
-                    temp_status = 'normal'
-                    if temp_value > 150:
-                        temp_status = 'critical'
-                    elif temp_value > 100:
-                        temp_status = 'warning'
-                    
-                    sensor_children.append({
-                        "id": f"sensor_{asset_id}_temp",
-                        "type": "Temperature",
-                        "value": round(temp_value, 2),
-                        "unit": "°C",
-                        "status": temp_status
-                    })
-                
-                # Vibration sensor
-                if telemetry_row['VIBRATION_MM_S'] is not None:
-                    vib_value = float(telemetry_row['VIBRATION_MM_S'])
-                    vib_status = 'normal'
-                    if vib_value > 2.0:
-                        vib_status = 'critical'
-                    elif vib_value > 1.5:
-                        vib_status = 'warning'
-                    
-                    sensor_children.append({
-                        "id": f"sensor_{asset_id}_vib",
-                        "type": "Vibration",
-                        "value": round(vib_value, 2),
-                        "unit": "mm/s",
-                        "status": vib_status
-                    })
-                
-                # Pressure sensor (if available)
-                if telemetry_row['PRESSURE_PSI'] is not None:
-                    pres_value = float(telemetry_row['PRESSURE_PSI'])
-                    pres_status = 'normal'
-                    if pres_value > 160 or pres_value < 120:
-                        pres_status = 'warning'
-                    
-                    sensor_children.append({
-                        "id": f"sensor_{asset_id}_pres",
-                        "type": "Pressure",
-                        "value": round(pres_value, 2),
-                        "unit": "PSI",
-                        "status": pres_status
-                    })
-            
-            # Get health data for this asset (convert both sides to ensure proper comparison)
-            asset_health = health_data[health_data['ASSET_ID'].astype(int) == asset_id] if not health_data.empty else pd.DataFrame()
-            asset_info = asset_info_data[asset_info_data['ASSET_ID'].astype(int) == asset_id] if not asset_info_data.empty else pd.DataFrame()
-            
-            if not asset_health.empty:
-                health_score = float(asset_health.iloc[0]['HEALTH_SCORE']) / 100.0 if asset_health.iloc[0]['HEALTH_SCORE'] is not None else 0.8  # Convert 0-100 to 0-1
-                failure_prob = float(asset_health.iloc[0]['FAILURE_PROBABILITY']) if asset_health.iloc[0]['FAILURE_PROBABILITY'] is not None else 0.05
-                rul_days = int(asset_health.iloc[0]['RUL_DAYS']) if asset_health.iloc[0]['RUL_DAYS'] is not None else 180
-                is_anomalous = asset_health.iloc[0]['IS_ANOMALOUS'] if asset_health.iloc[0]['IS_ANOMALOUS'] is not None else False
-                
-                # Determine status based on health score and anomalies
-                if is_anomalous or health_score < 0.5:
-                    status = "Critical"
-                elif health_score < 0.7:
-                    status = "Warning"
-                else:
-                    status = "Online"
-            else:
-                health_score = 0.8
-                status = "Online"
-                failure_prob = 0.05
-                rul_days = 180
-            
-            # Get downtime cost from asset info
-            if not asset_info.empty:
-                downtime_cost = float(asset_info.iloc[0]['DOWNTIME_IMPACT_PER_HOUR']) if asset_info.iloc[0]['DOWNTIME_IMPACT_PER_HOUR'] is not None else 5000
-            else:
-                downtime_cost = 5000
-            
-            # Create asset object with real data
-            asset_obj = {
-                "id": f"asset_{asset_id}",
-                "name": asset['ASSET_NAME'],
-                "type": "asset",
-                "healthScore": health_score,
-                "status": status,
-                "pof": f"{failure_prob * 100:.1f}%",
-                "cost": f"${downtime_cost:,.0f}/hr",
-                "children": sensor_children
-            }
-            
-            processes[process_id]["children"].append(asset_obj)
-        
-        # Add processes to line data
-        for process in processes.values():
-            line_data["children"].append(process)
-        
-        # Add line to factory data
-        factory_data["children"].append(line_data)
-        
-        # Debug completion
-        elapsed = time.time() - start_time
-        asset_count = len(assets_data)
-        process_count = len(processes)
-        st.success(f"✅ Loaded {process_count} processes, {asset_count} assets in {elapsed:.2f}s")
-        
-        return factory_data
-        
-    except Exception as e:
-        st.error(f"❌ Error loading factory data: {str(e)}")
-        import traceback
-        st.code(traceback.format_exc())
-        return {"id": "error", "name": "Error", "type": "plant", "children": []}
\ No newline at end of file
+        processes[process_id]["children"].append(asset_obj)
+    
+    # Add processes to line data
+    for process in processes.values():
+        line_data["children"].append(process)
+    
+    # Add line to factory data
+    factory_data["children"].append(line_data)
+    
+    # Debug completion
+    elapsed = time.time() - start_time
+    asset_count = len(assets_data)
+    process_count = len(processes)
+    st.success(f"✅ Loaded {process_count} processes, {asset_count} assets in {elapsed:.2f}s")
+    
+    return factory_data
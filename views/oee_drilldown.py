@@ -7,12 +7,14 @@
 #   - Provides a clear drill-path from a high-level plant comparison down to individual production lines.
 #
 # DATA SOURCES:
-#   - `HYPERFORGE.SILVER` Layer: This view queries the transactional and dimensional data to build
-#     the OEE hierarchy.
+#   - `HYPERFORGE.GOLD.AGG_LINE_DAILY_PRODUCTION`: A dynamic table that pre-sums the production
+#     log per plant, line and day. It is built from the `HYPERFORGE.SILVER` layer:
 #     - `FCT_PRODUCTION_LOG`: The core fact table containing runtime and production counts.
 #     - `DIM_ASSET`: To link production data to the asset hierarchy.
 #     - `DIM_LINE`: To link assets to their production lines.
 #     - `DIM_PLANT`: To link lines to their parent plants.
+#   - The view sums it per plant and per line in one query (GROUPING SETS), so only the
+#     aggregated rows are transferred.
 #
 # FUNCTIONALITY & DRILL PATH:
 #   1. Plant Comparison (Level 1):
@@ -27,12 +29,13 @@
 #
 # VISUALIZATIONS:
 #   - `plotly.express.bar`: Renders the plant-by-plant OEE comparison.
-#   - `st.dataframe` with Style API: Displays the line-level breakdown, using background
-#     gradients to highlight low-performing lines.
+#   - `plotly.express.imshow`: Displays the line-level breakdown as a heatmap of the OEE
+#     components, using a red color scale to highlight low-performing lines.
 #
 # USER INTERACTION:
 #   - `st.selectbox`: The primary control for allowing the user to select a plant and trigger
-#     the drill-down to the line level.
+#     the drill-down to the line level. It lives in an `st.fragment` with the line table, so a
+#     plant change reruns only the drill-down, not the plant chart.
 #   - `st.session_state`: The selected plant's name is stored in the session state
 #     (e.g., `st.session_state['selected_plant_name']`). This demonstrates how state can be
 #     persisted for use in other (hypothetical) drill-path views, such as a dedicated
@@ -41,58 +44,83 @@
 # ==================================================================================================
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 from utils.data_loader import run_query
-from utils.calculations import calculate_oee
+from utils.calculations import add_oee_columns
+
+# Production summed per plant and per plant/line in one pass over the daily line rollup
+# (GOLD.AGG_LINE_DAILY_PRODUCTION); plant rows have a NULL LINE_NAME
+OEE_ROLLUP_QUERY = """
+    SELECT
+        PLANT_NAME,
+        LINE_NAME,
+        GROUPING(LINE_NAME) AS IS_PLANT_ROW,
+        SUM(PLANNED_RUNTIME_HOURS) AS PLANNED_RUNTIME_HOURS,
+        SUM(ACTUAL_RUNTIME_HOURS) AS ACTUAL_RUNTIME_HOURS,
+        SUM(UNITS_PRODUCED) AS UNITS_PRODUCED,
+        SUM(UNITS_SCRAPPED) AS UNITS_SCRAPPED
+    FROM HYPERFORGE.GOLD.AGG_LINE_DAILY_PRODUCTION
+    GROUP BY GROUPING SETS ((PLANT_NAME), (PLANT_NAME, LINE_NAME))
+"""
+
+# Summed production columns (Snowflake NUMBER sums arrive as Decimal objects)
+PRODUCTION_SUM_COLUMNS = ['PLANNED_RUNTIME_HOURS', 'ACTUAL_RUNTIME_HOURS', 'UNITS_PRODUCED', 'UNITS_SCRAPPED']
+
+# Display names for the OEE columns added by add_oee_columns
+OEE_DISPLAY_COLUMNS = {'OEE': 'OEE', 'AVAILABILITY': 'Availability', 'PERFORMANCE': 'Performance', 'QUALITY': 'Quality'}
+
+@st.cache_data(ttl=600, show_spinner=False)
+def get_oee_breakdown():
+    """Plant OEE sorted best-first, and line OEE indexed by PLANT_NAME, from the rollup query."""
+    # This single query returns the aggregated production figures for both levels of the hierarchy.
+    oee_df = run_query(OEE_ROLLUP_QUERY)
+    oee_df = add_oee_columns(oee_df.astype({col: float for col in PRODUCTION_SUM_COLUMNS}))
+    oee_df = oee_df.rename(columns=OEE_DISPLAY_COLUMNS)
+    # Split on GROUPING() rather than a NULL LINE_NAME, which a line row can also have
+    is_plant_row = oee_df.pop('IS_PLANT_ROW') == 1
+
+    plant_oee = oee_df.loc[is_plant_row, ['PLANT_NAME', *OEE_DISPLAY_COLUMNS.values()]]
+    plant_oee = plant_oee.sort_values('OEE', ascending=False).reset_index(drop=True)
+    # Line rows indexed by plant once, so each drill-down rerun is an index lookup
+    lines_oee = oee_df.loc[~is_plant_row].set_index('PLANT_NAME')
+    return plant_oee, lines_oee
 
 def show_page():
     """Renders the OEE Drill-Down page."""
     st.header("📉 OEE Drill-Down")
 
-    # --- On-Demand Data Loading ---
-    # This single, comprehensive query fetches all data needed for the OEE hierarchy.
-    query = """
-  SELECT
-            P.PLANT_NAME,
-            L.LINE_NAME,
-            PR.PROCESS_NAME,
-            A.ASSET_NAME,
-            A.ASSET_UNS_NK,
-            PL.PLANNED_RUNTIME_HOURS,
-            PL.ACTUAL_RUNTIME_HOURS,
-            PL.UNITS_PRODUCED,
-            PL.UNITS_SCRAPPED
-        FROM HYPERFORGE.SILVER.FCT_PRODUCTION_LOG PL
-        JOIN HYPERFORGE.SILVER.DIM_ASSET A ON PL.ASSET_ID = A.ASSET_ID AND A.IS_CURRENT = TRUE
-        JOIN HYPERFORGE.SILVER.DIM_PROCESS PR ON PR.PROCESS_ID = A.PROCESS_ID
-        JOIN HYPERFORGE.SILVER.DIM_LINE L ON PR.LINE_ID = L.LINE_ID
-        JOIN HYPERFORGE.SILVER.DIM_PLANT P ON L.PLANT_ID = P.PLANT_ID;
-    """
-    df = run_query(query)
-
-    # --- OEE Calculations & UI ---
-    plant_oee = df.groupby('PLANT_NAME').apply(calculate_oee).apply(pd.Series)
-    plant_oee.columns = ['OEE', 'Availability', 'Performance', 'Quality']
-    plant_oee = plant_oee.sort_values('OEE', ascending=False).reset_index()
+    # --- On-Demand Data Loading & OEE Calculations ---
+    # Cached together with the query, so reruns skip the OEE arithmetic as well as Snowflake.
+    plant_oee, lines_oee = get_oee_breakdown()
 
+    # --- UI ---
     st.subheader("1. Plant Performance Comparison")
-    fig_plant = px.bar(plant_oee, x='PLANT_NAME', y='OEE', text=plant_oee['OEE'].apply(lambda x: f'{x:.1%}'), title="OEE by Plant")
+    fig_plant = px.bar(plant_oee, x='PLANT_NAME', y='OEE', title="OEE by Plant")
+    fig_plant.update_traces(texttemplate='%{y:.1%}')
     st.plotly_chart(fig_plant, use_container_width=True)
 
+    display_line_drilldown(plant_oee['PLANT_NAME'], lines_oee)
+
+@st.fragment
+def display_line_drilldown(plant_names, lines_oee):
+    """Line-level OEE table for one plant (fragment - plant changes rerun only this)."""
     st.subheader("2. Line Performance Drill-Down")
-    selected_plant = st.selectbox("Select a Plant to Investigate:", options=plant_oee['PLANT_NAME'])
+    selected_plant = st.selectbox("Select a Plant to Investigate:", options=plant_names)
     
     # Store the selection in the session state for cross-page drill-path functionality.
     st.session_state['selected_plant_name'] = selected_plant
     st.info(f"Drill path state saved: Plant '{selected_plant}' is now active.")
     
     if selected_plant:
-        line_df = df[df['PLANT_NAME'] == selected_plant]
-        line_oee = line_df.groupby('LINE_NAME').apply(calculate_oee).apply(pd.Series)
-        line_oee.columns = ['OEE', 'Availability', 'Performance', 'Quality']
-        line_oee = line_oee.sort_values('OEE').reset_index()
+        line_oee = lines_oee.loc[[selected_plant], ['LINE_NAME', *OEE_DISPLAY_COLUMNS.values()]]
+        line_oee = line_oee.sort_values('OEE').reset_index(drop=True)
         
-        st.dataframe(line_oee.style.format({
-            'OEE': '{:.2%}', 'Availability': '{:.2%}', 'Performance': '{:.2%}', 'Quality': '{:.2%}'
-        }).background_gradient(cmap='Reds_r', subset=['OEE', 'Availability']), use_container_width=True)
\ No newline at end of file
+        # Heatmap of the OEE components per line; the red scale highlights low performers and
+        # is drawn by Plotly in the browser rather than as per-cell Styler HTML
+        metrics = list(OEE_DISPLAY_COLUMNS.values())
+        fig_lines = px.imshow(
+            line_oee[metrics].to_numpy(), x=metrics, y=line_oee['LINE_NAME'],
+            color_continuous_scale='Reds_r', text_auto='.2%', aspect='auto'
+        )
+        fig_lines.update_layout(yaxis_title=None, coloraxis_showscale=False)
+        st.plotly_chart(fig_lines, use_container_width=True)
\ No newline at end of file